@@ -1,17 +1,30 @@
 # analysis.py
-from trading_simulation import enter_trades, monitor_and_close_trades, calculate_unrealized_pnl
+# trading_simulation (pandas/yfinance) and mt5_execution (MetaTrader5) are imported
+# lazily in the branches that use them, so --analysis-only runs skip that import cost.
 from utils.utils import fetch_top_stocks, filter_stocks_by_performance
-from mt5_execution import enqueue_signal_queue  # NEW: queue tickers for intraday CRSI entries
-import sqlite3
+from utils.rate_limit import RateLimiter
+import utils.utils
+from db_schema import get_connection
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from functools import lru_cache
+from itertools import repeat
 import argparse
+import io
 
-def analyze_market_sentiment(filtered, top_n, lookback_days, min_positive=10):
-    ranked_stocks = [stock[0] for stock in fetch_top_stocks(top_n)]
+@lru_cache(maxsize=8)
+def _fetch_top_stocks(top_n):
+    # strategies sharing the same top_n reuse one query; tuple keeps the cached value immutable
+    return tuple(fetch_top_stocks(top_n))
+
+@lru_cache(maxsize=32)
+def _analyze_market_sentiment(filtered, top_n, lookback_days, min_positive):
+    ranked_stocks = tuple(stock[0] for stock in _fetch_top_stocks(top_n))
 
     if filtered:
         # Filter: bullish stocks + pad with bearish if needed
         filtered_stocks, _ = filter_stocks_by_performance(
-            ranked_stocks,
+            list(ranked_stocks),
             lookback_days=lookback_days,
             min_positive=min_positive
         )
@@ -19,7 +32,12 @@ def analyze_market_sentiment(filtered, top_n, lookback_days, min_positive=10):
     else:
         filtered_stocks = []
 
-    return filtered_stocks, ranked_stocks
+    return tuple(filtered_stocks), ranked_stocks
+
+def analyze_market_sentiment(filtered, top_n, lookback_days, min_positive=10):
+    # identical (filtered, top_n, lookback_days, min_positive) runs skip the per-ticker candle fetches
+    filtered_stocks, ranked_stocks = _analyze_market_sentiment(bool(filtered), top_n, lookback_days, min_positive)
+    return list(filtered_stocks), list(ranked_stocks)
 
 def run_analysis_and_trades(
     strategy,
@@ -54,12 +72,16 @@ def run_analysis_and_trades(
 
     # CRSI flow: queue tickers for the intraday watcher
     if queue_only:
+        from mt5_execution import enqueue_signal_queue  # queue tickers for intraday CRSI entries
         print(f"Queuing {len(stocks)} tickers for strategy {strategy} into signal_queue (CRSI watcher will handle entries).")
-        with sqlite3.connect("algo1.db") as conn:
+        with get_connection() as conn:
             enqueue_signal_queue(conn, strategy, stocks)
         return
 
     # Legacy immediate-open path (kept for backward compatibility / testing)
+    if open_new or do_monitor:
+        from trading_simulation import enter_trades, monitor_and_close_trades, calculate_unrealized_pnl
+
     if open_new:
         print(f"Immediate open requested: entering up to {trade_count} trades now for strategy {strategy}.")
         enter_trades(stocks, trade_count, strategy)
@@ -69,15 +91,58 @@ def run_analysis_and_trades(
         monitor_and_close_trades(strategy)
         calculate_unrealized_pnl(strategy)
 
+def _run_strategy(strat, simulate_only, analysis_only):
+    print(f"\n----- Running Strategy {strat['id']} -----")
+    run_analysis_and_trades(
+        strategy       = strat["id"],
+        use_filtered   = strat["use_filtered"],
+        top_n          = strat["top_n"],
+        trade_count    = strat["trade_count"],
+        lookback_days  = strat["lookback_days"],
+        min_positive   = strat["min_positive"],
+
+        # CLI wiring:
+        # --analysis-only  → just print list
+        # --simulate-only  → queue_only=True (CRSI flow), no immediate opens/monitoring
+        open_new       = not (simulate_only or analysis_only),
+        do_monitor     = False if simulate_only or analysis_only else False,  # default off for CRSI
+        queue_only     = simulate_only and not analysis_only,
+        analysis_only  = analysis_only,
+    )
+
+def _init_worker(n_workers):
+    # each process gets its own copy of FINNHUB_LIMITER: give every worker an equal share
+    # of the rate so all of them together stay under the Finnhub cap
+    lim = utils.utils.FINNHUB_LIMITER
+    utils.utils.FINNHUB_LIMITER = RateLimiter(rate=max(1.0, lim.rate / n_workers), per=lim.per)
+
+def _run_strategy_captured(strat, simulate_only, analysis_only):
+    # worker-side: buffer the strategy's prints so the parent can replay them unmixed, in order;
+    # an exception is returned with the output so the parent prints both before re-raising
+    buf = io.StringIO()
+    error = None
+    try:
+        with redirect_stdout(buf):
+            _run_strategy(strat, simulate_only, analysis_only)
+    except Exception as e:
+        error = e
+    return buf.getvalue(), error
+
 if __name__ == "__main__":
     cli = argparse.ArgumentParser()
     cli.add_argument("--simulate-only", action="store_true",
                      help="Queue only (no immediate opens, no monitoring). Use with CRSI watcher.")
     cli.add_argument("--analysis-only", action="store_true",
                      help="Only print the selected tickers – no queuing, orders or monitoring")
+    cli.add_argument("--parallel", action="store_true",
+                     help="Run the strategies in separate processes instead of one after another")
 
     args = cli.parse_args()
 
+    # scores may have changed since the last run in this interpreter
+    _fetch_top_stocks.cache_clear()
+    _analyze_market_sentiment.cache_clear()
+
     # You can specify your strategy parameters here
     strategies = [
         # look at 40 best scores, open max 10 trades
@@ -93,21 +158,16 @@ if __name__ == "__main__":
          "lookback_days": 31, "min_positive": 15},
     ]
 
-    for strat in strategies:
-        print(f"\n----- Running Strategy {strat['id']} -----")
-        run_analysis_and_trades(
-            strategy       = strat["id"],
-            use_filtered   = strat["use_filtered"],
-            top_n          = strat["top_n"],
-            trade_count    = strat["trade_count"],
-            lookback_days  = strat["lookback_days"],
-            min_positive   = strat["min_positive"],
-
-            # CLI wiring:
-            # --analysis-only  → just print list
-            # --simulate-only  → queue_only=True (CRSI flow), no immediate opens/monitoring
-            open_new       = not (args.simulate_only or args.analysis_only),
-            do_monitor     = False if args.simulate_only or args.analysis_only else False,  # default off for CRSI
-            queue_only     = args.simulate_only and not args.analysis_only,
-            analysis_only  = args.analysis_only,
-        )
+    if args.parallel:
+        # strategies only share read-only inputs and write disjoint strategy_id rows,
+        # so each runs in its own process (and its own SQLite connection)
+        with ProcessPoolExecutor(max_workers=len(strategies), initializer=_init_worker,
+                                 initargs=(len(strategies),)) as ex:
+            for output, error in ex.map(_run_strategy_captured, strategies,
+                                        repeat(args.simulate_only), repeat(args.analysis_only)):
+                print(output, end="")
+                if error is not None:
+                    raise error
+    else:
+        for strat in strategies:
+            _run_strategy(strat, args.simulate_only, args.analysis_only)
@@ -1,28 +1,30 @@
-import sqlite3
-from db_schema import initialize_database
+from contextlib import closing
+from db_schema import initialize_database, get_connection, DB_PATH
 
-initialize_database()
+# Fixed statements (no table names formatted into SQL), reused from the statement cache.
+_TRUNCATES = (
+    "DELETE FROM strategies;",
+    "DELETE FROM open_trades;",
+    "DELETE FROM closed_trades;",
+    "DELETE FROM pnl_history;",
+    "DELETE FROM signal_queue;",
+)
 
-def list_tables(db_path="algo1.db"):
-    conn = sqlite3.connect(db_path)
-    cur = conn.cursor()
-    cur.execute("SELECT name FROM sqlite_master WHERE type='table';")
-    tables = cur.fetchall()
+def list_tables(db_path=DB_PATH):
+    with closing(get_connection(db_path)) as conn:
+        tables = conn.execute("SELECT name FROM sqlite_master WHERE type='table';").fetchall()
     print("Tables in DB:", [t[0] for t in tables])
-    conn.close()
 
-def clear_trade_tables(db_path="algo1.db"):
-    connection = sqlite3.connect(db_path)
-    cursor = connection.cursor()
-    tables = ["strategies", "open_trades", "closed_trades", "pnl_history", "signal_queue"]
-    for table in tables:
-        cursor.execute(f"DELETE FROM {table};")
-        print(f"Cleared table: {table}")
-    connection.commit()
-    connection.close()
+def clear_trade_tables(db_path=DB_PATH):
+    # one transaction for all tables: a single commit, and nothing is cleared if a DELETE fails
+    with closing(get_connection(db_path)) as connection, connection:
+        for sql in _TRUNCATES:
+            connection.execute(sql)
+    print(f"Cleared tables: {', '.join(sql.split()[-1].rstrip(';') for sql in _TRUNCATES)}")
     print("✅ All trade tables cleared.")
 
 if __name__ == "__main__":
+    initialize_database()
     list_tables()
     clear_trade_tables()
 
@@ -1,173 +1,314 @@
 # db_schema.py
 
+import operator
+import atexit
+import os
 import sqlite3
+import threading
+from contextlib import closing
+
+DB_PATH = os.getenv("ALGO1_DB", "algo1.db")
+BUSY_TIMEOUT = 30  # seconds to wait on a lock held by another process
+_CONN = None      # shared writer connection for the store_* helpers
+_INITIALIZED = False  # set once initialize_database() has run in this process
+_INIT_LOCK = threading.Lock()
+
+# Reusing the same SQL string lets sqlite3 serve it from its statement cache.
+_INSERT_PT_SQL = """
+    INSERT INTO price_targets (ticker, low_price, average_price, current_price, high_price, price_target_score)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+_PT_COLS = operator.itemgetter('Low', 'Average', 'Current', 'High')
+_UPSERT_SCORE_SQL = """
+    INSERT OR REPLACE INTO scores
+        (ticker, price_target_score, analyst_avg_score, date, year_month)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+
+def get_connection(db_path=DB_PATH):
+    """
+    Open a SQLite connection tuned for this single-writer workload.
+    Args:
+        db_path (str): Path to the SQLite database file.
+    Returns:
+        sqlite3.Connection: Connection with WAL and relaxed sync PRAGMAs applied.
+    """
+    # Other processes (analysis, watchers) may hold the write lock briefly:
+    # wait for it instead of failing with "database is locked".
+    connection = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT)
+    # WAL lets readers (e.g. the CRSI watcher) run while another process writes.
+    # synchronous=NORMAL only fsyncs at WAL checkpoints: a power loss can drop the
+    # last few commits, but the database file itself cannot be corrupted.
+    connection.execute("PRAGMA journal_mode=WAL;")
+    connection.execute("PRAGMA synchronous=NORMAL;")
+    connection.execute("PRAGMA temp_store=MEMORY;")
+    connection.execute("PRAGMA mmap_size=268435456;")
+    connection.execute("PRAGMA cache_size=-65536;")  # 64 MiB page cache
+    return connection
+
+
+def _shared_connection():
+    """
+    Return the module-level connection used by all store_* helpers.
+    It is this process's single writer: writes accumulate in one open transaction
+    until flush_db() is called, instead of each helper contending for the lock.
+    """
+    global _CONN
+    if _CONN is None:
+        _CONN = get_connection()
+    return _CONN
+
+
+def flush_db():
+    """
+    Commit everything written through the shared connection.
+    """
+    if _CONN is not None:
+        _CONN.commit()
+
+
+@atexit.register
+def close_db():
+    """
+    Commit and close the shared connection (registered to run at interpreter exit).
+    """
+    global _CONN
+    if _CONN is not None:
+        _CONN.commit()
+        _CONN.close()
+        _CONN = None
+
 
 def store_top_analysts_data(dataframe):
     """
     Store top analysts data in the SQLite database.
+    Goes through the shared writer connection and commits it.
     Args:
         dataframe (pd.DataFrame): DataFrame containing top analysts data.
     """
-    connection = sqlite3.connect("algo1.db")
-    cursor = connection.cursor()
+    connection = _shared_connection()
 
-    # Insert data into the top_analysts table
-    for _, row in dataframe.iterrows():
-        cursor.execute("""
-        INSERT INTO top_analysts (analyst, overall_score, direction_score, price_score, recommendation, price_target, date)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (row['Analyst'], row['Overall Score'], row['Direction Score'], row['Price Score'], row['Recommendation'], row['Price Target'], row['Date']))
+    # Insert all rows into the top_analysts table in a single transaction
+    rows = list(zip(dataframe['Analyst'], dataframe['Overall Score'], dataframe['Direction Score'],
+                    dataframe['Price Score'], dataframe['Recommendation'], dataframe['Price Target'],
+                    dataframe['Date']))
+    connection.executemany("""
+    INSERT INTO top_analysts (analyst, overall_score, direction_score, price_score, recommendation, price_target, date)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, rows)
 
     connection.commit()
-    connection.close()
     print("Top analysts data stored.")
 
 
-def store_price_target_data(ticker, price_data, price_target_score):
+def store_price_target_data(price_targets):
     """
-    Store price target data in the SQLite database.
+    Store price target data in the SQLite database with one executemany.
+    The rows are committed by the next flush_db() call.
     Args:
-        ticker (str): Stock ticker symbol.
-        price_data (dict): Dictionary with price target data.
-        price_target_score (int): Calculated price target score.
+        price_targets (list[tuple]): (ticker, price_data, price_target_score) tuples, where
+            price_data is a dict with 'Low', 'Average', 'Current' and 'High' prices.
     """
-    connection = sqlite3.connect("algo1.db")
-    cursor = connection.cursor()
+    rows = [(ticker, *map(float, _PT_COLS(price_data)), price_target_score)
+            for ticker, price_data, price_target_score in price_targets]
+    _shared_connection().executemany(_INSERT_PT_SQL, rows)
 
-    cursor.execute("""
-    INSERT INTO price_targets (ticker, low_price, average_price, current_price, high_price, price_target_score)
-    VALUES (?, ?, ?, ?, ?, ?)
-    """, (ticker, float(price_data['Low']), float(price_data['Average']), float(price_data['Current']), float(price_data['High']), price_target_score))
+    if rows:
+        print(f"Price target data for {len(rows)} tickers stored.")
 
-    connection.commit()
-    connection.close()
-    print(f"Price target data for {ticker} stored.")
+
+def store_score_data(rows):
+    """
+    Upsert monthly ticker scores in the SQLite database with one executemany.
+    Shares the connection of store_price_target_data; committed by flush_db().
+    Args:
+        rows (list[tuple]): (ticker, price_target_score, analyst_avg_score, date, year_month)
+            tuples; scores in percent, date 'YYYY-MM-DD', year_month 'YYYY_MM'.
+    """
+    _shared_connection().executemany(_UPSERT_SCORE_SQL, rows)
 
 def initialize_database():
-    connection = sqlite3.connect("algo1.db")
-    cursor = connection.cursor()
-
-    # Create Strategies Table (for documentation/tracking)
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS strategies (
-        id INTEGER PRIMARY KEY,
-        description TEXT
-    );
-    """)
-
-    # Create Price Targets Table
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS price_targets (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        ticker TEXT,
-        low_price REAL,
-        average_price REAL,
-        current_price REAL,
-        high_price REAL,
-        price_target_score INTEGER
-    );
-    """)
-
-    # Create Scores Table
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS scores (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        ticker TEXT,
-        price_target_score INTEGER,
-        analyst_avg_score REAL,
-        date TEXT,
-        year_month TEXT,
-        UNIQUE(ticker, year_month)
-    );
-    """)
-        
-    # ── Open Trades ───────────────────────────────────────────────────────────
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS open_trades (
-        id              INTEGER PRIMARY KEY AUTOINCREMENT,
-        ticker          TEXT    NOT NULL,
-        entry_price     REAL    NOT NULL,
-        stop_loss       REAL    NOT NULL,
-        target_price    REAL    NOT NULL,
-        shares          INTEGER,            -- optional fixed-share sizing
-        trailing_stop   REAL,               -- ATR trail (optional)
-        executed        INTEGER DEFAULT 0,  -- 0 = not sent / not filled, 1 = filled
-        execution_price REAL,
-        execution_time  TEXT,
-        date_opened     TEXT    NOT NULL,
-        strategy_id     INTEGER,
-        side            TEXT DEFAULT 'LONG',
-        FOREIGN KEY(strategy_id) REFERENCES strategies(id)
-    );
-    """)
-
-    # ── Closed Trades (archive) ───────────────────────────────────────────────
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS closed_trades (
-        id              INTEGER PRIMARY KEY AUTOINCREMENT,
-        ticker          TEXT    NOT NULL,
-        entry_price     REAL    NOT NULL,
-        stop_loss       REAL    NOT NULL,
-        target_price    REAL    NOT NULL,
-        exit_price      REAL    NOT NULL,
-        pnl             REAL    NOT NULL,
-        date_opened     TEXT    NOT NULL,
-        date_closed     TEXT    NOT NULL,
-        strategy_id     INTEGER,
-        exit_reason     TEXT,               -- e.g. 'EOD', 'ATRStop'
-        FOREIGN KEY(strategy_id) REFERENCES strategies(id)
-    );
-    """)
-
-    # ── PnL history ───────────────────────────────────────────────────────────
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS pnl_history (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        ticker TEXT,
-        entry_price REAL,
-        current_price REAL,
-        pnl_percent REAL,
-        check_date TEXT,
-        strategy_id INTEGER,
-        FOREIGN KEY(strategy_id) REFERENCES strategies(id)
-    );
-    """)
-
-    # ── Signal Queue (watchlist for Connors RSI triggers) ─────────────────────
-
-    
-    cursor.execute("""
-                   
-    ALTER TABLE open_trades ADD COLUMN executed INTEGER DEFAULT 0;
-    ALTER TABLE open_trades ADD COLUMN execution_price REAL;
-    ALTER TABLE open_trades ADD COLUMN execution_time TEXT;
-                   
-    CREATE TABLE IF NOT EXISTS signal_queue (
-        id           INTEGER PRIMARY KEY AUTOINCREMENT,
-        ticker       TEXT        NOT NULL,
-        strategy_id  INTEGER     NOT NULL,
-        date_queued  TEXT        NOT NULL,         -- 'YYYY-MM-DD' Europe/Paris
-        status       TEXT        NOT NULL DEFAULT 'PENDING',  -- PENDING | ENTERED | CANCELLED
-        last_crsi    REAL,                          -- optional: latest computed CRSI
-        last_checked TEXT,                          -- optional: last indicator check timestamp
-        FOREIGN KEY(strategy_id) REFERENCES strategies(id),
-        UNIQUE(ticker, strategy_id, date_queued)
-    );
-    """)
-
-    cursor.execute("""
-    CREATE INDEX IF NOT EXISTS ix_signal_queue_status
-    ON signal_queue (strategy_id, date_queued, status);
-    """)
-
-
-    # Helpful indexes for fast lookups during the session
-    cursor.execute("""
-    CREATE INDEX IF NOT EXISTS ix_signal_queue_status
-    ON signal_queue (strategy_id, date_queued, status);
-    """)
+    """
+    Create the tables and indexes (and migrate older databases) once per process.
+    Later calls return immediately instead of re-running every CREATE ... IF NOT EXISTS.
+    """
+    global _INITIALIZED
+    with _INIT_LOCK:
+        if _INITIALIZED:
+            return
+        _create_schema()
+        _INITIALIZED = True
 
 
-    connection.commit()
-    connection.close()
+def _create_schema():
+    # closing() releases the file handle even if a statement fails. sqlite3 does
+    # not open a transaction before DDL on its own, so BEGIN explicitly: the
+    # `with connection:` block then commits the whole schema at once, or rolls
+    # it back (e.g. a half-applied migration) on error.
+    with closing(get_connection()) as connection, connection:
+        connection.isolation_level = None
+        cursor = connection.cursor()
+        cursor.execute("BEGIN")
+
+        # Create Strategies Table (for documentation/tracking)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS strategies (
+            id INTEGER PRIMARY KEY,
+            description TEXT
+        );
+        """)
+
+        # Create Price Targets Table
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS price_targets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ticker TEXT,
+            low_price REAL,
+            average_price REAL,
+            current_price REAL,
+            high_price REAL,
+            price_target_score INTEGER
+        );
+        """)
+
+        # Create Scores Table
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS scores (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ticker TEXT,
+            price_target_score INTEGER,
+            analyst_avg_score REAL,
+            date TEXT,
+            year_month TEXT,
+            UNIQUE(ticker, year_month)
+        );
+        """)
+
+        # fetch_top_stocks: WHERE year_month = ? ORDER BY <rank> LIMIT n walks this index
+        # directly (no sort). The expression must match the ORDER BY in utils.fetch_top_stocks.
+        cursor.execute("""
+        CREATE INDEX IF NOT EXISTS ix_scores_ym_rank
+        ON scores (year_month, (analyst_avg_score * 0.5 + price_target_score * 0.5));
+        """)
+
+        # ── Open Trades ───────────────────────────────────────────────────────────
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS open_trades (
+            id              INTEGER PRIMARY KEY AUTOINCREMENT,
+            ticker          TEXT    NOT NULL,
+            entry_price     REAL    NOT NULL,
+            stop_loss       REAL    NOT NULL,
+            target_price    REAL    NOT NULL,
+            shares          INTEGER,            -- optional fixed-share sizing
+            trailing_stop   REAL,               -- ATR trail (optional)
+            executed        INTEGER DEFAULT 0,  -- 0 = not sent / not filled, 1 = filled
+            execution_price REAL,
+            execution_time  TEXT,
+            date_opened     TEXT    NOT NULL,
+            strategy_id     INTEGER,
+            side            TEXT DEFAULT 'LONG' CHECK(side IN ('LONG','SHORT')),
+            FOREIGN KEY(strategy_id) REFERENCES strategies(id)
+        );
+        """)
+
+        # Older databases predate the execution columns: add only the missing ones
+        # (re-adding an existing column fails with "duplicate column name").
+        existing = {row[1] for row in cursor.execute("PRAGMA table_info(open_trades);")}
+        for column, ddl in (("executed", "INTEGER DEFAULT 0"),
+                            ("execution_price", "REAL"),
+                            ("execution_time", "TEXT")):
+            if column not in existing:
+                cursor.execute(f"ALTER TABLE open_trades ADD COLUMN {column} {ddl};")
+
+        # monitor loops / execution filter on (strategy_id, executed)
+        cursor.execute("""
+        CREATE INDEX IF NOT EXISTS ix_open_trades_strat_exec
+        ON open_trades (strategy_id, executed);
+        """)
+
+        # mt5 fetch_pending: MAX(date_opened) per strategy is one index seek, and the
+        # rows of that day are a range scan instead of a full table scan
+        cursor.execute("""
+        CREATE INDEX IF NOT EXISTS ix_open_trades_strat_date
+        ON open_trades (strategy_id, date_opened);
+        """)
+
+        # per-ticker lookups (trailing stops: WHERE ticker = ? AND executed = 1)
+        cursor.execute("""
+        CREATE INDEX IF NOT EXISTS ix_open_trades_ticker
+        ON open_trades (ticker, executed);
+        """)
+
+        # ── Closed Trades (archive) ───────────────────────────────────────────────
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS closed_trades (
+            id              INTEGER PRIMARY KEY AUTOINCREMENT,
+            ticker          TEXT    NOT NULL,
+            entry_price     REAL    NOT NULL,
+            stop_loss       REAL    NOT NULL,
+            target_price    REAL    NOT NULL,
+            exit_price      REAL    NOT NULL,
+            pnl             REAL    NOT NULL,
+            date_opened     TEXT    NOT NULL,
+            date_closed     TEXT    NOT NULL,
+            strategy_id     INTEGER,
+            exit_reason     TEXT,               -- e.g. 'EOD', 'ATRStop'
+            FOREIGN KEY(strategy_id) REFERENCES strategies(id)
+        );
+        """)
+
+        cursor.execute("""
+        CREATE INDEX IF NOT EXISTS ix_closed_trades_strat
+        ON closed_trades (strategy_id, date_closed);
+        """)
+
+        # ── PnL history ───────────────────────────────────────────────────────────
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS pnl_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ticker TEXT,
+            entry_price REAL,
+            current_price REAL,
+            pnl_percent REAL,
+            check_date TEXT,
+            strategy_id INTEGER,
+            FOREIGN KEY(strategy_id) REFERENCES strategies(id)
+        );
+        """)
+
+        # ── Signal Queue (watchlist for Connors RSI triggers) ─────────────────────
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS signal_queue (
+            id           INTEGER PRIMARY KEY AUTOINCREMENT,
+            ticker       TEXT        NOT NULL,
+            strategy_id  INTEGER     NOT NULL,
+            date_queued  TEXT        NOT NULL,         -- 'YYYY-MM-DD' Europe/Paris
+            status       TEXT        NOT NULL DEFAULT 'PENDING',  -- PENDING | ENTERED | CANCELLED
+            last_crsi    REAL,                          -- optional: latest computed CRSI
+            last_checked TEXT,                          -- optional: last indicator check timestamp
+            FOREIGN KEY(strategy_id) REFERENCES strategies(id),
+            UNIQUE(ticker, strategy_id, date_queued)
+        );
+        """)
+
+        # Helpful indexes for fast lookups during the session
+        cursor.execute("""
+        CREATE INDEX IF NOT EXISTS ix_signal_queue_status
+        ON signal_queue (strategy_id, date_queued, status);
+        """)
+
+        # ── Symbol map (DB ticker → MT5 symbol, filled by mt5_execution) ─────────
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS symbol_map (
+            ticker      TEXT PRIMARY KEY,
+            mt5_symbol  TEXT NOT NULL
+        ) WITHOUT ROWID;
+        """)
+
+        # Refresh planner statistics (sqlite_stat1) for tables whose row counts changed
+        # enough to matter, so e.g. ix_scores_ym_rank is chosen over a full scan.
+        # Cheap when nothing changed; a full ANALYZE is left to maintenance runs.
+        cursor.execute("PRAGMA optimize;")
+
     print("Database initialized.")
\ No newline at end of file
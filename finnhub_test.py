@@ -2,9 +2,11 @@
 import os
 import sys
 import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from dotenv import load_dotenv
 import finnhub
+from requests.adapters import HTTPAdapter
 from utils.utils import load_stocks_from_csv
 
 load_dotenv()
@@ -12,7 +14,12 @@ API_KEY = os.getenv("FINNHUB_API_KEY")
 if not API_KEY:
     raise RuntimeError("FINNHUB_API_KEY not set in environment or .env file")
 
+MAX_WORKERS = 10
+
 finn = finnhub.Client(api_key=API_KEY)
+# keep one pooled keep-alive connection per worker thread so concurrent calls
+# reuse TLS sessions instead of opening (and discarding) extra connections
+finn._session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=MAX_WORKERS))
 
 
 def fetch_finnhub_recommendations(ticker: str):
@@ -35,6 +42,11 @@ def fetch_finnhub_price_target(ticker: str):
 test_list=["NVDA", "MSFT", "MU", "SLB", "KEYS", "NI", "LVS", "META", "AVGO", "WST", "LLY", "GOOGL", "AMT"]
     
 if __name__ == "__main__":
-    for ticker in test_list:
-        print(fetch_finnhub_recommendations(ticker))
-        print(fetch_finnhub_price_target(ticker))
+    # both calls per ticker are independent HTTP round-trips: run them concurrently
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+        futures = [(ex.submit(fetch_finnhub_recommendations, ticker),
+                    ex.submit(fetch_finnhub_price_target, ticker))
+                   for ticker in test_list]
+        for rec, pt in futures:
+            print(rec.result())
+            print(pt.result())
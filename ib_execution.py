@@ -4,13 +4,15 @@ import os
 import sys
 import time as _time
 from dataclasses import dataclass
-from datetime import datetime, time, timedelta
+from datetime import datetime, time, timedelta, timezone
 from typing import List, TypedDict
+from zoneinfo import ZoneInfo
 
-import pytz
 import sqlite3
 from ib_insync import IB, Stock, MarketOrder, util
 
+from db_schema import get_connection
+
 # ---------------------------------------------------------------------------
 # User‑tunable defaults (env → CLI override)
 # ---------------------------------------------------------------------------
@@ -37,7 +39,7 @@ LEVERAGE_FACTOR = _env_float("LEVERAGE_FACTOR", 1.0)
 FIXED_DOLLARS   = _env_float("TRADE_DOLLARS", 0.0)     # 0 → auto size
 
 MARKET_OPEN = time(9, 30)
-EASTERN_TZ  = pytz.timezone("US/Eastern")
+EASTERN_TZ  = ZoneInfo("America/New_York")   # tzdata on Windows
 DB_PATH     = os.getenv("ALGO1_DB", "algo1.db")
 
 # ---------------------------------------------------------------------------
@@ -52,7 +54,8 @@ class TradeRow(TypedDict):
 
 
 def get_conn() -> sqlite3.Connection:
-    return sqlite3.connect(DB_PATH)
+    # WAL + synchronous=NORMAL + busy timeout, shared with the rest of algo1
+    return get_connection(DB_PATH)
 
 
 def fetch_pending(conn: sqlite3.Connection, strategy_id: int) -> List[TradeRow]:
@@ -65,14 +68,19 @@ def fetch_pending(conn: sqlite3.Connection, strategy_id: int) -> List[TradeRow]:
     return [dict(r) for r in rows]
 
 
-def mark_filled(conn: sqlite3.Connection, row_id: int, fill: float):
-    conn.execute(
-        """UPDATE open_trades
-              SET executed=1, execution_price=?, execution_time=CURRENT_TIMESTAMP
-            WHERE id=?""",
-        (fill, row_id),
-    )
-    conn.commit()
+_MARK_FILLED_SQL = """UPDATE open_trades
+                         SET executed=1, execution_price=?, execution_time=?
+                       WHERE id=?"""
+
+
+def mark_filled(conn: sqlite3.Connection, fills: List[tuple[float, int]]):
+    """Record (fill_price, row_id) pairs in one transaction (single commit)."""
+    if not fills:
+        return
+    # same 'YYYY-MM-DD HH:MM:SS' UTC format as CURRENT_TIMESTAMP, formatted once per batch
+    now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    with conn:
+        conn.executemany(_MARK_FILLED_SQL, [(fill, now, row_id) for fill, row_id in fills])
 
 # ---------------------------------------------------------------------------
 # IB helpers
@@ -81,9 +89,8 @@ def mark_filled(conn: sqlite3.Connection, row_id: int, fill: float):
 
 def wait_for_open():
     now = datetime.now(EASTERN_TZ)
-    tgt = now.replace(hour=MARKET_OPEN.hour, minute=MARKET_OPEN.minute,
-                      second=0, microsecond=0)
-    if now.time() >= MARKET_OPEN:
+    tgt = datetime.combine(now.date(), MARKET_OPEN, tzinfo=EASTERN_TZ)
+    if now >= tgt:
         return
     sleep = (tgt - now).total_seconds() + 5  # +5 s cushion
     print(f"Waiting {sleep/60:.1f} min for market open…", flush=True)
@@ -99,43 +106,58 @@ def connect_ib(live: bool) -> IB:
 
 
 def get_net_liq(ib: IB) -> float:
-    summary = ib.accountSummary()
-    for tag in summary:
-        if tag.tag == "NetLiquidation":
-            return float(tag.value)
+    # accountValues() is the cache ib_insync keeps from the account-updates
+    # subscription made on connect – no extra request; the full summary is the fallback
+    for values in (ib.accountValues, ib.accountSummary):
+        val = next((v.value for v in values() if v.tag == "NetLiquidation"), None)
+        if val is not None:
+            return float(val)
     raise RuntimeError("NetLiquidation not found in account summary")
 
-def last_trade_price(ib: IB, contract: Contract) -> float | None:
+def last_trade_prices(ib: IB, contracts: List[Contract]) -> dict[int, float]:
     """
-    Try a few inexpensive ways to get a tradable price.
-    Returns None if nothing works within ~2 s.
+    Batched tradable prices for qualified contracts, keyed by conId.
+    Each fallback step is one request for all contracts still missing a price;
+    contracts with no price at all are absent from the result.
     """
-    # 1️⃣ snapshot quote (fast, free)
-    ticker = ib.reqTickers(contract)
-    if ticker and (p := ticker[0].marketPrice()) and p > 0:
-        return p
-
-    # 2️⃣ delayed quote (works even without real-time data)
-    ib.reqMarketDataType(4)          # 4 = delayed/frozen
-    ticker = ib.reqTickers(contract)
-    if ticker and (p := ticker[0].marketPrice()) and p > 0:
-        return p
-
-    # 3️⃣ 1-bar historical close (always available, but costs an extra call)
-    bar = ib.reqHistoricalData(
-        contract,
-        endDateTime="",
-        durationStr="1 D",
-        barSizeSetting="1 day",
-        whatToShow="TRADES",
-        useRTH=True,
-        formatDate=1,
-        keepUpToDate=False,
-        timeout=2,
-    )
-    if bar:
-        return bar[-1].close
-    return None
+    prices: dict[int, float] = {}
+
+    def _snapshot(batch):
+        for t in ib.reqTickers(*batch):
+            if (p := t.marketPrice()) and p > 0:      # NaN > 0 is False
+                prices[t.contract.conId] = p
+        return [c for c in batch if c.conId not in prices]
+
+    # 1️⃣ snapshot quotes (fast, free)
+    missing = _snapshot(contracts)
+
+    # 2️⃣ delayed quotes for the stragglers (works even without real-time data)
+    if missing:
+        ib.reqMarketDataType(4)          # 4 = delayed/frozen
+        missing = _snapshot(missing)
+
+    # 3️⃣ 1-bar historical close (always available, but costs an extra call) – run concurrently
+    if missing:
+        bar_lists = ib.run(*(
+            ib.reqHistoricalDataAsync(
+                c,
+                endDateTime="",
+                durationStr="1 D",
+                barSizeSetting="1 day",
+                whatToShow="TRADES",
+                useRTH=True,
+                formatDate=1,
+                keepUpToDate=False,
+                timeout=2,
+            )
+            for c in missing
+        ))
+        if len(missing) == 1:            # ib.run returns a bare result for one awaitable
+            bar_lists = [bar_lists]
+        for c, bars in zip(missing, bar_lists):
+            if bars:
+                prices[c.conId] = bars[-1].close
+    return prices
 
 # ---------------------------------------------------------------------------
 # Execution core
@@ -163,6 +185,7 @@ def execute_strategy(strategy_id: int, *, live: bool = False,
 
     wait_for_open()
     ib = connect_ib(live)
+    sent: list = []   # (row, sym, Trade) for every order placed; fills written once at the end
 
     try:
         # allocation for notional sizing
@@ -173,16 +196,24 @@ def execute_strategy(strategy_id: int, *, live: bool = False,
             print(f"NetLiq ${net_liq:,.2f} · leverage {leverage} "
                   f"⇒ ${alloc:,.2f} each position")
 
-        for row in pending:
+        # one qualify round-trip for the whole list; unknown symbols keep conId 0
+        contracts = [Stock(row["ticker"], "SMART", "USD") for row in pending]
+        ib.qualifyContracts(*contracts)
+
+        qualified = [c for c in contracts if c.conId]
+        prices = last_trade_prices(ib, qualified) if even_bet and qualified else {}
+
+        for row, contract in zip(pending, contracts):
             side = row["side"].upper()
             act  = "BUY" if side == "LONG" else "SELL"
             sym  = row["ticker"]
 
-            contract = Stock(sym, "SMART", "USD")
-            ib.qualifyContracts(contract)
+            if not contract.conId:
+                print(f"⚠ {sym}: contract not qualified, skipping.")
+                continue
 
             if even_bet:
-                price = last_trade_price(ib, contract)
+                price = prices.get(contract.conId)
                 if price is None:
                     print(f"⚠ {sym}: no price, skipping.")
                     continue
@@ -193,19 +224,24 @@ def execute_strategy(strategy_id: int, *, live: bool = False,
                     print(f"⚠ {sym}: shares not specified – skipping")
                     continue
 
-            print(f"{act} {sym} qty {qty} @≈{price:.2f} – sending")
+            px_note = f" @≈{price:.2f}" if even_bet else ""
+            print(f"{act} {sym} qty {qty}{px_note} – sending")
             order  = MarketOrder(act, qty)
-            trade  = ib.placeOrder(contract, order)
-            while not trade.isDone():
-                ib.sleep(0.25)
+            sent.append((row, sym, ib.placeOrder(contract, order)))
+
+        # every order is working at once; wait until all of them are final
+        while not all(trade.isDone() for _, _, trade in sent):
+            ib.waitOnUpdate()          # wakes on the next IB message, no fixed tick
 
+        for _, sym, trade in sent:
             fill = trade.orderStatus.avgFillPrice or 0.0
-            status = trade.orderStatus.status
-            print(f"{sym} {status} {fill:.2f}")
-            if status == "Filled":
-                mark_filled(conn, row["id"], fill)
+            print(f"{sym} {trade.orderStatus.status} {fill:.2f}")
 
     finally:
+        # also on errors/Ctrl-C: orders already filled must not be re-sent next run
+        mark_filled(conn, [(trade.orderStatus.avgFillPrice or 0.0, row["id"])
+                           for row, _, trade in sent
+                           if trade.orderStatus.status == "Filled"])
         ib.disconnect()
         conn.close()
         print("Completed execution.")
@@ -23,7 +23,7 @@ def ping_trade(live: bool = False):
         print("→ BUY 1 AAPL")
         t1 = ib.placeOrder(contract, buy)
         while not t1.isDone():
-            ib.sleep(0.2)
+            ib.waitOnUpdate()          # wakes on the next IB message, no fixed tick
         fill_buy = t1.orderStatus.avgFillPrice
         print(f"   filled {fill_buy:.2f}")
 
@@ -34,7 +34,7 @@ def ping_trade(live: bool = False):
         print("← SELL 1 AAPL")
         t2 = ib.placeOrder(contract, sell)
         while not t2.isDone():
-            ib.sleep(0.2)
+            ib.waitOnUpdate()          # wakes on the next IB message, no fixed tick
         fill_sell = t2.orderStatus.avgFillPrice
         print(f"   filled {fill_sell:.2f}")
 
@@ -1,53 +1,176 @@
 # indicators.py
 from __future__ import annotations
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# numba is optional: without it the @njit kernels below run as plain Python.
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda fn: fn
+
+@njit(cache=True, fastmath=True, boundscheck=False)
+def _wilder_smooth(gain, loss, period):
+    # Wilder's smoothing: seeded with the plain mean of bars 1..period, sequential after that
+    n = gain.shape[0]
+    roll_up = np.zeros(n)
+    roll_dn = np.zeros(n)
+    if n <= period:
+        return roll_up, roll_dn      # too short to seed: rsi() masks all of it to NaN
+    up = 0.0
+    dn = 0.0
+    for i in range(1, period+1):
+        up += gain[i]
+        dn += loss[i]
+    up /= period
+    dn /= period
+    roll_up[period] = up
+    roll_dn[period] = dn
+    for i in range(period+1, n):
+        up = (up*(period-1) + gain[i]) / period
+        dn = (dn*(period-1) + loss[i]) / period
+        roll_up[i] = up
+        roll_dn[i] = dn
+    return roll_up, roll_dn
 
 def rsi(series: np.ndarray, period: int) -> np.ndarray:
     series = np.asarray(series, dtype=float)
     deltas = np.diff(series, prepend=series[0])
-    gain = np.where(deltas > 0, deltas, 0.0)
-    loss = np.where(deltas < 0, -deltas, 0.0)
-
-    # Wilder's smoothing
-    roll_up = np.zeros_like(series)
-    roll_dn = np.zeros_like(series)
-    roll_up[period] = gain[1:period+1].mean()
-    roll_dn[period] = loss[1:period+1].mean()
-    for i in range(period+1, len(series)):
-        roll_up[i] = (roll_up[i-1]*(period-1) + gain[i]) / period
-        roll_dn[i] = (roll_dn[i-1]*(period-1) + loss[i]) / period
-
-    rs = np.divide(roll_up, roll_dn, out=np.zeros_like(roll_up), where=roll_dn!=0)
-    rsi = 100.0 - (100.0 / (1.0 + rs))
+    gain = np.zeros_like(deltas)
+    loss = np.zeros_like(deltas)
+    np.copyto(gain, deltas, where=deltas > 0)          # NaN deltas stay 0 in both
+    np.negative(deltas, out=loss, where=deltas < 0)
+
+    roll_up, roll_dn = _wilder_smooth(gain, loss, period)
+
+    # 100 - 100 / (1 + rs), computed in place in the rs buffer
+    rsi = np.divide(roll_up, roll_dn, out=np.zeros_like(roll_up), where=roll_dn!=0)
+    np.add(rsi, 1.0, out=rsi)
+    np.divide(100.0, rsi, out=rsi)
+    np.subtract(100.0, rsi, out=rsi)
     rsi[:period] = np.nan
     return rsi
 
 def compute_streak(closes: np.ndarray) -> np.ndarray:
     # +n if consecutive up bars, -n if consecutive down bars
-    streak = np.zeros_like(closes, dtype=float)
-    for i in range(1, len(closes)):
-        if closes[i] > closes[i-1]:
-            streak[i] = streak[i-1] + 1 if streak[i-1] > 0 else 1
-        elif closes[i] < closes[i-1]:
-            streak[i] = streak[i-1] - 1 if streak[i-1] < 0 else -1
-        else:
-            streak[i] = 0
+    closes = np.asarray(closes, dtype=float)
+    streak = np.zeros_like(closes)
+    if len(closes) < 2:
+        return streak
+    d = np.diff(closes)
+    sgn = (d > 0).astype(np.int64) - (d < 0)   # NaN compares False -> 0, like a flat bar
+    # a run restarts wherever the direction changes; run length = distance to its start + 1
+    idx = np.arange(len(sgn))
+    change = np.empty(len(sgn), dtype=bool)
+    change[0] = True
+    np.not_equal(sgn[1:], sgn[:-1], out=change[1:])
+    start = np.maximum.accumulate(np.where(change, idx, 0))
+    streak[1:] = (idx - start + 1) * sgn       # flat bars (sgn == 0) stay 0
     return streak
 
-def percent_rank(values: np.ndarray, lookback: int) -> np.ndarray:
-    pr = np.full_like(values, fill_value=np.nan, dtype=float)
-    for i in range(lookback, len(values)):
-        window = values[i-lookback+1:i+1]
-        pr[i] = 100.0 * (window <= values[i]).sum() / lookback
+def percent_rank(values: np.ndarray, lookback: int, tile: int = 65536) -> np.ndarray:
+    values = np.asarray(values, dtype=float)
+    pr = np.full_like(values, fill_value=np.nan)
+    n = len(values)
+    if n <= lookback:
+        return pr
+    # row j of the view is values[j:j+lookback], i.e. the window ending at bar j+lookback-1;
+    # ranks start at bar `lookback`, so skip row 0. Tiles bound the (rows x lookback) temporary.
+    win = sliding_window_view(values, lookback)
+    for lo in range(lookback, n, tile):
+        hi = min(lo + tile, n)
+        rows = win[lo - lookback + 1:hi - lookback + 1]
+        cnt = (rows <= values[lo:hi, None]).sum(axis=1, dtype=np.int32)
+        pr[lo:hi] = 100.0 * cnt / lookback
     return pr
 
+@njit(cache=True, boundscheck=False)
+def _crsi_fused(closes, rsi_p, streak_p, pr_n, start):
+    # Single pass over closes computing the same CRSI as the component functions: Wilder
+    # up/dn for price and for the streak live in scalars, roc1 in a pr_n-slot ring buffer.
+    # Bars before `start` only advance the recursions and stay NaN (skips the O(pr_n) rank).
+    # (no fastmath: NaN closes must compare False exactly like in the NumPy path)
+    n = closes.shape[0]
+    crsi = np.full(n, np.nan)
+    ring = np.zeros(pr_n)
+    up_p = 0.0
+    dn_p = 0.0
+    up_s = 0.0
+    dn_s = 0.0
+    streak = 0.0
+    warm = max(rsi_p, streak_p, pr_n, start)
+    for i in range(1, n):
+        d = closes[i] - closes[i-1]
+        g = d if d > 0 else 0.0
+        l = -d if d < 0 else 0.0
+
+        if d > 0:
+            new_streak = streak + 1 if streak > 0 else 1.0
+        elif d < 0:
+            new_streak = streak - 1 if streak < 0 else -1.0
+        else:
+            new_streak = 0.0
+        ds = new_streak - streak
+        streak = new_streak
+        gs = ds if ds > 0 else 0.0
+        ls = -ds if ds < 0 else 0.0
+
+        if i < rsi_p:
+            up_p += g
+            dn_p += l
+        elif i == rsi_p:
+            up_p = (up_p + g) / rsi_p
+            dn_p = (dn_p + l) / rsi_p
+        else:
+            up_p = (up_p*(rsi_p-1) + g) / rsi_p
+            dn_p = (dn_p*(rsi_p-1) + l) / rsi_p
+
+        if i < streak_p:
+            up_s += gs
+            dn_s += ls
+        elif i == streak_p:
+            up_s = (up_s + gs) / streak_p
+            dn_s = (dn_s + ls) / streak_p
+        else:
+            up_s = (up_s*(streak_p-1) + gs) / streak_p
+            dn_s = (dn_s*(streak_p-1) + ls) / streak_p
+
+        roc = d / closes[i-1] * 100.0
+        ring[i % pr_n] = roc
+
+        if i >= warm:
+            rs = up_p / dn_p if dn_p != 0 else 0.0
+            rsi_price = 100.0 - (100.0 / (1.0 + rs))
+            rs = up_s / dn_s if dn_s != 0 else 0.0
+            rsi_streak = 100.0 - (100.0 / (1.0 + rs))
+            cnt = 0
+            for k in range(pr_n):
+                if ring[k] <= roc:
+                    cnt += 1
+            crsi[i] = (rsi_price + rsi_streak + 100.0 * cnt / pr_n) / 3.0
+    return crsi
+
 def connors_rsi_30m(closes: np.ndarray,
                     rsi_period: int = 3,
                     streak_rsi_period: int = 2,
                     pr_lookback: int = 100) -> np.ndarray:
     closes = np.asarray(closes, dtype=float)
-    roc1 = np.zeros_like(closes)
-    roc1[1:] = (closes[1:] - closes[:-1]) / closes[:-1] * 100.0
+    if HAVE_NUMBA:
+        return _crsi_fused(np.ascontiguousarray(closes), rsi_period, streak_rsi_period, pr_lookback, 0)
+
+    # roc1 = (c[i] - c[i-1]) / c[i-1] * 100 without full-size temporaries
+    roc1 = np.empty_like(closes)
+    roc1[:1] = 0.0
+    tail = roc1[1:]
+    np.subtract(closes[1:], closes[:-1], out=tail)
+    np.divide(tail, closes[:-1], out=tail)
+    np.multiply(tail, 100.0, out=tail)
 
     # components
     rsi_price   = rsi(closes, rsi_period)
@@ -55,5 +178,102 @@ def connors_rsi_30m(closes: np.ndarray,
     rsi_streak  = rsi(streak_vals, streak_rsi_period)
     pr_rank     = percent_rank(roc1, pr_lookback)
 
-    crsi = (rsi_price + rsi_streak + pr_rank) / 3.0
+    crsi = np.add(rsi_price, rsi_streak, out=rsi_price)
+    np.add(crsi, pr_rank, out=crsi)
+    np.divide(crsi, 3.0, out=crsi)
     return crsi
+
+def connors_rsi_last(closes: np.ndarray,
+                     rsi_period: int = 3,
+                     streak_rsi_period: int = 2,
+                     pr_lookback: int = 100) -> float:
+    """CRSI of the last bar only, i.e. connors_rsi_30m(closes)[-1] (NaN if too short)."""
+    closes = np.asarray(closes, dtype=float)
+    n = len(closes)
+    if n == 0:
+        return float("nan")
+    if HAVE_NUMBA:
+        return float(_crsi_fused(np.ascontiguousarray(closes), rsi_period,
+                                 streak_rsi_period, pr_lookback, n - 1)[-1])
+
+    # the RSIs are recursive over the whole series; the rank only needs the last window
+    rsi_price  = rsi(closes, rsi_period)[-1]
+    rsi_streak = rsi(compute_streak(closes), streak_rsi_period)[-1]
+    if n <= pr_lookback:
+        return float("nan")
+    window = closes[n - pr_lookback - 1:]
+    roc1 = (window[1:] - window[:-1]) / window[:-1] * 100.0
+    pr_last = 100.0 * np.count_nonzero(roc1 <= roc1[-1]) / pr_lookback
+    return float((rsi_price + rsi_streak + pr_last) / 3.0)
+
+@njit(cache=True, boundscheck=False)
+def _last_pivots(highs, lows, left, right):
+    # Scan back from the last bar with `right` bars after it: the first pivot high/low
+    # met are the most recent ones, so the scan usually stops a few bars in.
+    # NaN when there is none (a NaN bar never qualifies: comparisons with it are False).
+    n = highs.shape[0]
+    res = np.nan
+    sup = np.nan
+    for i in range(n - right - 1, left - 1, -1):
+        if res != res:
+            hi = highs[i]
+            ok = True
+            for j in range(1, left + 1):
+                if not hi >= highs[i-j]:
+                    ok = False
+                    break
+            if ok:
+                for j in range(1, right + 1):
+                    if not hi >= highs[i+j]:
+                        ok = False
+                        break
+            if ok:
+                res = hi
+        if sup != sup:
+            lo = lows[i]
+            ok = True
+            for j in range(1, left + 1):
+                if not lo <= lows[i-j]:
+                    ok = False
+                    break
+            if ok:
+                for j in range(1, right + 1):
+                    if not lo <= lows[i+j]:
+                        ok = False
+                        break
+            if ok:
+                sup = lo
+        if res == res and sup == sup:
+            break
+    return res, sup
+
+def pivot_levels(highs: np.ndarray, lows: np.ndarray,
+                 left: int = 3, right: int = 3) -> tuple[float | None, float | None]:
+    """
+    Last pivot high (resistance) and pivot low (support), or None: a bar whose high
+    (low) is >= (<=) those of the `left` bars before and the `right` bars after it.
+    """
+    highs = np.ascontiguousarray(highs, dtype=float)
+    lows  = np.ascontiguousarray(lows, dtype=float)
+    n = len(highs)
+    if n < left + right + 3:
+        return None, None
+    if HAVE_NUMBA:
+        res, sup = _last_pivots(highs, lows, left, right)
+        return (None if np.isnan(res) else float(res),
+                None if np.isnan(sup) else float(sup))
+
+    # one row per candidate bar i in [left, n-right), the window centred on it
+    w = left + right + 1
+    hw = sliding_window_view(highs, w)
+    lw = sliding_window_view(lows, w)
+    res_i = np.flatnonzero((hw[:, left:left+1] >= hw).all(axis=1))
+    sup_i = np.flatnonzero((lw[:, left:left+1] <= lw).all(axis=1))
+    return (float(hw[res_i[-1], left]) if res_i.size else None,
+            float(lw[sup_i[-1], left]) if sup_i.size else None)
+
+if HAVE_NUMBA:
+    # compile (or load from the on-disk cache) now rather than on the first live bar
+    _wilder_smooth(np.zeros(3), np.zeros(3), 1)
+    _crsi_fused(np.ones(3), 1, 1, 1, 0)
+    _last_pivots(np.ones(3), np.ones(3), 1, 1)
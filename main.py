@@ -1,17 +1,40 @@
-# main.py (throttled, sequential)
-from multiprocessing import cpu_count  # still imported, but we won't use Pool
+# main.py (throttled, concurrent)
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import sqlite3, os, time
-from db_schema import initialize_database, store_price_target_data
+from itertools import repeat
+import atexit, os, threading, time
+from db_schema import initialize_database, store_price_target_data, store_score_data, flush_db
 from dotenv import load_dotenv
 import finnhub
-from utils.utils import load_stocks_from_csv
+from requests.adapters import HTTPAdapter
+from utils.utils import load_stocks_from_csv, FINNHUB_LIMITER
 
 load_dotenv()
 FINNHUB_API_KEY = os.getenv("FINNHUB_API_KEY")
 if not FINNHUB_API_KEY:
     raise RuntimeError("FINNHUB_API_KEY not set")
-finn = finnhub.Client(api_key=FINNHUB_API_KEY)
+# concurrent tickers (I/O-bound, so threads rather than processes); the request rate
+# itself is capped by FINNHUB_LIMITER
+MAX_WORKERS = int(os.getenv("FINNHUB_WORKERS", 8))
+
+# one Finnhub client (requests.Session + keep-alive connection) per worker thread,
+# created on the thread's first ticker and reused for all later ones
+_TL = threading.local()
+_CLIENTS = []
+
+def _client() -> finnhub.Client:
+    finn = getattr(_TL, "finn", None)
+    if finn is None:
+        finn = finnhub.Client(api_key=FINNHUB_API_KEY)
+        finn._session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        _TL.finn = finn
+        _CLIENTS.append(finn)
+    return finn
+
+@atexit.register
+def _close_clients():
+    for finn in _CLIENTS:
+        finn._session.close()
 
 # ------- your helpers (unchanged) -------
 # _latest_recommendation, _analyst_buy_score, _price_target_payload
@@ -20,6 +43,7 @@ finn = finnhub.Client(api_key=FINNHUB_API_KEY)
 # Optional: tiny per-call retry/backoff for 429s
 def _with_backoff(fn, *args, tries=3, base_sleep=0.8):
     for i in range(tries):
+        FINNHUB_LIMITER.acquire()   # shared 30 calls/s budget across worker threads
         try:
             return fn(*args)
         except Exception as e:
@@ -32,14 +56,14 @@ def _with_backoff(fn, *args, tries=3, base_sleep=0.8):
             raise
 
 def _latest_recommendation(ticker: str):
-    data = _with_backoff(finn.recommendation_trends, ticker) or []
+    data = _with_backoff(_client().recommendation_trends, ticker) or []
     if not data:
         return None
     return max(data, key=lambda x: x.get("period", ""))
 
 def _price_target_payload(ticker: str):
-    pt  = _with_backoff(finn.price_target, ticker) or {}
-    q   = _with_backoff(finn.quote, ticker) or {}
+    pt  = _with_backoff(_client().price_target, ticker) or {}
+    q   = _with_backoff(_client().quote, ticker) or {}
     current = q.get("c")
     mean    = pt.get("targetMean")
     low     = pt.get("targetLow")
@@ -50,9 +74,12 @@ def _price_target_payload(ticker: str):
     payload = {"Low": float(low), "Average": float(mean), "Current": float(current), "High": float(high)}
     return payload, float(price_score)
 
-def process_ticker(ticker: str):
+def process_ticker(ticker: str, today: str, ym: str):
     # keep as you had it, calling the helpers above
-    initialize_database()
+    # runs in a worker thread: no DB access here, main() writes what this returns
+    # returns (price_target, score_row); either may be None
+    # (schema is created once in main(), not per ticker)
+    price_target = None
     try:
         latest_rec = _latest_recommendation(ticker)
         analyst_recs_score = None
@@ -67,24 +94,14 @@ def process_ticker(ticker: str):
 
         pt_payload, price_score = _price_target_payload(ticker)
         if pt_payload and (price_score is not None):
-            store_price_target_data(ticker, pt_payload, price_score)
-            print(f"Price target data for {ticker} stored.")
+            price_target = (ticker, pt_payload, price_score)
         else:
             print(f"No price target data for {ticker}.")
 
         if (analyst_recs_score is not None) and (price_score is not None):
             final_score = 0.6 * analyst_recs_score + 0.4 * price_score
-            today = datetime.now().strftime("%Y-%m-%d")
-            ym    = datetime.now().strftime("%Y_%m")
-            with sqlite3.connect("algo1.db") as conn:
-                cur = conn.cursor()
-                cur.execute("""
-                    INSERT OR REPLACE INTO scores
-                        (ticker, price_target_score, analyst_avg_score, date, year_month)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (ticker, float(price_score), float(analyst_recs_score), today, ym))
-                conn.commit()
             print(f"{ticker}: Analyst {analyst_recs_score:.1f}  Price {price_score:.1f}  Final {final_score:.1f}")
+            return price_target, (ticker, float(price_score), float(analyst_recs_score), today, ym)
         else:
             missing = []
             if analyst_recs_score is None: missing.append("analyst_recs")
@@ -92,27 +109,44 @@ def process_ticker(ticker: str):
             print(f"{ticker}: skipped score (missing: {', '.join(missing)})")
     except Exception as e:
         print(f"Error processing {ticker}: {e}")
+    return price_target, None
 
 def main():
     initialize_database()
     tickers = load_stocks_from_csv(file_name="stocks.csv")
 
-    # Force sequential to respect throttling
-    num_workers = 1
-    print(f"Using {num_workers} process for throttled execution.")
-
-    # Throttle knobs
-    PAUSE_EVERY    = 50   # <- as you requested
-    PAUSE_SECONDS  = 1
-    SLEEP_EACH_SEC = 0.15  # tiny delay after each ticker to be extra safe
-
-    for idx, t in enumerate(tickers, 1):
-        process_ticker(t)
-        print(f"{idx}/{len(tickers)} tickers processed.")
-        time.sleep(SLEEP_EACH_SEC)
-        if idx % PAUSE_EVERY == 0:
-            print(f"Pausing {PAUSE_SECONDS}s after {idx} tickers...")
-            time.sleep(PAUSE_SECONDS)
+    # Finnhub calls overlap across threads; FINNHUB_LIMITER keeps the rate under the cap
+    num_workers = max(1, min(MAX_WORKERS, len(tickers)))
+
+    # one date for the whole run: every score of this run lands in the same month bucket
+    now   = datetime.now()
+    today = now.strftime("%Y-%m-%d")
+    ym    = now.strftime("%Y_%m")
+    print(f"Using {num_workers} threads for throttled execution.")
+
+    FLUSH_EVERY = 50   # tickers per DB transaction
+
+    price_targets, score_rows = [], []
+    try:
+        with ThreadPoolExecutor(max_workers=num_workers) as ex:
+            # results come back in ticker order; DB writes stay on this thread
+            for idx, (price_target, row) in enumerate(ex.map(process_ticker, tickers, repeat(today), repeat(ym)), 1):
+                if price_target:
+                    price_targets.append(price_target)
+                if row:
+                    score_rows.append(row)
+                print(f"{idx}/{len(tickers)} tickers processed.")
+                if idx % FLUSH_EVERY == 0:
+                    store_price_target_data(price_targets)
+                    store_score_data(score_rows)
+                    price_targets.clear()
+                    score_rows.clear()
+                    flush_db()
+    finally:
+        # price targets and scores are written in one transaction per batch
+        store_price_target_data(price_targets)
+        store_score_data(score_rows)
+        flush_db()
 
 if __name__ == "__main__":
     main()
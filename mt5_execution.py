@@ -29,10 +29,11 @@ The script will:
 -------------------------------------------------------------------------------"""
 from __future__ import annotations
 
-import os, sys, time, math, logging, argparse
+import atexit, os, sys, time, math, logging, logging.handlers, argparse, queue
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone, time as dt_time
-from decimal import Decimal, ROUND_FLOOR
-from typing import List
+from functools import lru_cache
 
 import MetaTrader5 as mt5
 from dotenv import load_dotenv
@@ -40,57 +41,116 @@ import sqlite3
 from typing import List, TypedDict
 from zoneinfo import ZoneInfo
 import numpy as np
-from indicators import connors_rsi_30m
-
-logging.basicConfig(format="%(asctime)s %(levelname)s %(message)s",
-                    level=logging.INFO,
-                    datefmt="%Y-%m-%d %H:%M:%S")
+from indicators import connors_rsi_last, pivot_levels
+from db_schema import get_connection, initialize_database
+from utils.rate_limit import RateLimiter
+
+# Records go through a queue to a background thread that does the stderr writes,
+# so log calls on the order path only cost an enqueue. Skipped (like basicConfig)
+# when the importing program already configured logging.
+if not logging.getLogger().handlers:
+    # the QueueHandler formats each record before enqueueing it, so the format is
+    # set there (by basicConfig) and the listener's StreamHandler just writes it
+    _LOG_QUEUE = queue.SimpleQueue()
+    _LOG_LISTENER = logging.handlers.QueueListener(_LOG_QUEUE, logging.StreamHandler())
+    logging.basicConfig(format="%(asctime)s %(levelname)s %(message)s",
+                        level=logging.INFO,
+                        datefmt="%Y-%m-%d %H:%M:%S",
+                        handlers=[logging.handlers.QueueHandler(_LOG_QUEUE)])
+    _LOG_LISTENER.start()
+    atexit.register(_LOG_LISTENER.stop)   # drains the queue before exit
 log = logging.getLogger("mt5exec")
 
+load_dotenv()   # once at import: .env supplies `timezone` and the MT5 credentials
+
+_MT5_LOGIN    = os.getenv("MT5_LOGIN", "0")
+_MT5_PASSWORD = os.getenv("MT5_PASSWORD")
+_MT5_SERVER   = os.getenv("MT5_SERVER")
+_TZ_NAME      = os.getenv("timezone", "Europe/Paris")
+
+try:
+    _TZ = ZoneInfo(_TZ_NAME)
+except Exception:
+    _TZ = None   # zoneinfo/tzdata missing → naive local time
+
+_EOD_START = dt_time(21, 55)   # Paris close window, see is_eod_window()
+_EOD_END   = dt_time(23, 30)
+
 # ---------------------------------------------------------------------------
 # DB
 # ---------------------------------------------------------------------------
 DB_PATH     = os.getenv("ALGO1_DB", "algo1.db")
 
+# concurrent order_send calls in execute_strategy, and the submit rate they share
+ORDER_WORKERS = int(os.getenv("MT5_ORDER_WORKERS", 4))
+PROBE_WORKERS = int(os.getenv("MT5_PROBE_WORKERS", 8))   # concurrent symbol lookups in Phase 1
+ORDER_LIMITER = RateLimiter(rate=float(os.getenv("MT5_ORDERS_PER_SEC", 5)), per=1.0)
+
 class TradeRow(TypedDict):
     id: int
     ticker: str
     shares: int | None
     side: str
+    mt5_symbol: str | None
+
 
+_CONN: sqlite3.Connection | None = None   # one connection per process, see get_conn()
 
 def get_conn() -> sqlite3.Connection:
-    return sqlite3.connect(DB_PATH)
+    """
+    Process-wide connection (WAL + synchronous=NORMAL + busy timeout, shared with the
+    rest of algo1). Opened on first use, closed at exit – callers must not close it.
+    """
+    global _CONN
+    if _CONN is None:
+        initialize_database()   # fetch_pending joins symbol_map, which older DBs lack
+        _CONN = get_connection(DB_PATH)
+        _CONN.row_factory = sqlite3.Row   # set once: the fetch helpers read columns by name
+        atexit.register(_CONN.close)
+    return _CONN
+
+def _dict_rows(conn: sqlite3.Connection, sql: str, params: tuple) -> list[dict]:
+    """Rows of `sql` as plain dicts, built from the raw tuples (no sqlite3.Row per row)."""
+    cur = conn.cursor()
+    cur.row_factory = None   # overrides the connection's sqlite3.Row for this query only
+    cur.execute(sql, params)
+    cols = [d[0] for d in cur.description]
+    return [dict(zip(cols, r)) for r in cur]
 
-def fetch_pending(conn: sqlite3.Connection, strategy_id: int) -> List[TradeRow]:
+def fetch_pending(conn: sqlite3.Connection, strategy_id: int) -> tuple[str | None, List[TradeRow]]:
     """
-    Return rows for the most recent trading day present in open_trades for this strategy.
+    Return (date, rows) for the most recent trading day present in open_trades for this strategy.
     Avoids 'today' timezone mismatches and doesn't depend on a non-existent 'executed' column.
     """
     latest = get_latest_trade_date(conn, strategy_id)
     if not latest:
-        return []
-
-    conn.row_factory = sqlite3.Row
-    rows = conn.execute(
-        """SELECT id, ticker, COALESCE(shares,0) AS shares, COALESCE(side,'LONG') AS side
-             FROM open_trades
-            WHERE strategy_id = ?
-              AND date_opened = ?""",
+        return None, []
+
+    # mt5_symbol comes from symbol_map (NULL for tickers never resolved before)
+    rows = _dict_rows(
+        conn,
+        """SELECT o.id, o.ticker, COALESCE(o.shares,0) AS shares,
+                  COALESCE(o.side,'LONG') AS side, m.mt5_symbol
+             FROM open_trades o
+             LEFT JOIN symbol_map m ON m.ticker = o.ticker
+            WHERE o.strategy_id = ?
+              AND o.date_opened = ?""",
         (strategy_id, latest),
-    ).fetchall()
-    return [dict(r) for r in rows]
+    )
+    return latest, rows
 
 
 
-def mark_filled(conn: sqlite3.Connection, row_id: int, fill: float):
+def mark_filled(conn: sqlite3.Connection, row_id: int, fill: float, *, commit: bool = False):
+    """Flag one row as filled; the caller commits the batch unless commit=True."""
     conn.execute(
         """UPDATE open_trades
               SET executed=1, execution_price=?, execution_time=CURRENT_TIMESTAMP
             WHERE id=?""",
         (fill, row_id),
     )
-    conn.commit()
+    if commit:
+        conn.commit()
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -98,10 +158,9 @@ def mark_filled(conn: sqlite3.Connection, row_id: int, fill: float):
 
 def initialize_mt5(live: bool = True) -> None:
     """Launch / connect to MetaTrader 5 terminal and log in."""
-    load_dotenv()
-    login     = int(os.getenv("MT5_LOGIN", 0))
-    password  = os.getenv("MT5_PASSWORD")
-    server    = os.getenv("MT5_SERVER")
+    login     = int(_MT5_LOGIN)
+    password  = _MT5_PASSWORD
+    server    = _MT5_SERVER
 
     if not all([login, password, server]):
         log.error("MT5 credentials missing – check your .env file")
@@ -113,6 +172,7 @@ def initialize_mt5(live: bool = True) -> None:
 
     acc_info = mt5.account_info()
     log.info("Logged in to %s – equity %.2f %s", server, acc_info.equity, acc_info.currency)
+    _prime_symbol_specs()
 
 
 def shutdown_mt5():
@@ -120,6 +180,54 @@ def shutdown_mt5():
     log.info("Disconnected from MetaTrader 5")
 
 
+def _best_price(tick) -> float | None:
+    """Last trade price, else bid, else ask (0.0 fields skipped); None without a tick."""
+    return (tick.last or tick.bid or tick.ask) if tick else None
+
+
+_SPEC_CACHE: dict[str, mt5.SymbolInfo] = {}   # symbol → SymbolInfo, see _symbol_spec()
+
+def _symbol_spec(sym: str):
+    """
+    SymbolInfo of `sym`, added to Market Watch when needed, fetched once per process.
+    Only for the static contract fields (volume_min/step/max, contract size, currencies):
+    its quote fields go stale, read prices from symbol_info_tick(). None when the symbol
+    is unknown or cannot be selected (not cached, so it is retried on the next call).
+    """
+    info = _SPEC_CACHE.get(sym)
+    if info is None:
+        info = mt5.symbol_info(sym)
+        if info is None or not info.visible:
+            if not mt5.symbol_select(sym, True) or info is None:   # select returns False on failure
+                return None
+        _SPEC_CACHE[sym] = info
+    return info
+
+def _prime_symbol_specs() -> None:
+    """
+    Seed _symbol_spec() with everything already in Market Watch: one symbols_get()
+    call instead of a symbol_info per symbol (and no symbol_select) on first use.
+    """
+    for info in mt5.symbols_get() or ():
+        if info.visible:
+            _SPEC_CACHE.setdefault(info.name, info)
+
+def _forget_spec_on_reject(sym: str, res) -> None:
+    # the broker changed the volume limits: refetch the spec on the next order
+    if res is not None and res.retcode == mt5.TRADE_RETCODE_INVALID_VOLUME:
+        _SPEC_CACHE.pop(sym, None)
+
+def _probe_symbol(sym: str):
+    """
+    (SymbolInfo, tick) for one symbol, adding it to Market Watch when needed.
+    (None, None) when the symbol is unknown or cannot be selected.
+    """
+    info = _symbol_spec(sym)
+    if info is None:
+        return None, None
+    return info, mt5.symbol_info_tick(sym)
+
+
 def get_price(symbol: str) -> float | None:
     tick = mt5.symbol_info_tick(symbol)
     if tick and tick.last > 0:
@@ -135,20 +243,30 @@ def round_shares(volume: float, *, cfd: bool) -> float:
     return math.floor(volume)
 
 
+# fields shared by every market order; order_market only adds the per-order ones
+_ORDER_TMPL = {
+    "action"      : mt5.TRADE_ACTION_DEAL,
+    "type_filling": mt5.ORDER_FILLING_IOC,
+    "magic"       : 99,
+    "comment"     : "auto‑exec",
+}
+_SIDE_TO_TYPE = {"BUY": mt5.ORDER_TYPE_BUY, "SELL": mt5.ORDER_TYPE_SELL}
+# EOD closes (opposite deal on the position's ticket) and SR30 breakout entries
+_CLOSE_TMPL = _ORDER_TMPL | {"comment": "auto-close"}
+_CLOSE_TYPE = {mt5.POSITION_TYPE_BUY: mt5.ORDER_TYPE_SELL, mt5.POSITION_TYPE_SELL: mt5.ORDER_TYPE_BUY}
+_SR30_TMPL  = _ORDER_TMPL | {"type": mt5.ORDER_TYPE_BUY, "comment": "sr30-breakout"}
+
 def order_market(symbol: str, side: str, qty: float, *, dev: int = 10):
-    request = {
-        "action"      : mt5.TRADE_ACTION_DEAL,
-        "symbol"      : symbol,
-        "volume"      : qty,
-        "type"        : mt5.ORDER_TYPE_BUY if side == "BUY" else mt5.ORDER_TYPE_SELL,
-        "type_filling": mt5.ORDER_FILLING_IOC,
-        "deviation"   : dev,
-        "magic"       : 99,
-        "comment"     : "auto‑exec",
+    # a new dict per call: order_market runs on several threads in execute_strategy
+    request = _ORDER_TMPL | {
+        "symbol"   : symbol,
+        "volume"   : qty,
+        "type"     : _SIDE_TO_TYPE[side],
+        "deviation": dev,
     }
-    res = mt5.order_send(request)
-    return res
+    return mt5.order_send(request)
 
+@lru_cache(maxsize=1024)   # a strategy trades a small, fixed set of tickers
 def normalize_symbol(ticker: str) -> str:
     """
     Convert a DB ticker to the exact string MT5 expects.
@@ -164,27 +282,79 @@ def normalize_symbol(ticker: str) -> str:
         return t
     return "#" + t
 
-def budget_in_quote_ccy(budget_eur: float, info: mt5.SymbolInfo) -> float:
+_SYMBOL_CACHE: dict[str, str] = {}   # ticker → MT5 symbol, mirrors symbol_map
+
+def resolve_mt5_symbol(conn: sqlite3.Connection, ticker: str) -> str:
     """
-    Convert a EUR budget to the symbol’s profit-currency (usually USD).
-    Falls back to 1:1 if EURUSD price unavailable.
+    MT5 symbol for a DB ticker: in-process cache, then the symbol_map table, then
+    normalize_symbol() – whose result is stored in symbol_map (committed with the
+    caller's next commit) so later runs get it straight from the JOIN in fetch_pending.
     """
-    if info.currency_profit == "EUR":
-        return budget_eur                      # already in EUR
-    if info.currency_profit == "USD":
-        eurusd = mt5.symbol_info_tick("EURUSD")
-        if eurusd and eurusd.bid > 0:
-            return budget_eur / eurusd.bid     # € → $
-    return budget_eur                          # naïve fallback
-
-
-def round_down(vol: float, step: float) -> float:
-    """Round *down* to the nearest allowed step (e.g. 0.01 or 1)."""
-    return math.floor(vol / step) * step
+    sym = _SYMBOL_CACHE.get(ticker)
+    if sym is None:
+        hit = conn.execute("SELECT mt5_symbol FROM symbol_map WHERE ticker = ?", (ticker,)).fetchone()
+        if hit:
+            sym = hit[0]
+        else:
+            sym = normalize_symbol(ticker)
+            conn.execute("INSERT OR IGNORE INTO symbol_map (ticker, mt5_symbol) VALUES (?, ?)",
+                         (ticker, sym))
+        _SYMBOL_CACHE[ticker] = sym
+    return sym
+
+# volumes are rounded down to their step as integer multiples of 1e-8 lot: in
+# integer units 0.29 / 0.01 is exactly 29 steps, not 28.999… → 28 as with floats
+_VOL_UNITS = 10**8
+_MAX_TOPUP_STEPS = 100_000   # execute_strategy: most extra volume steps handed out in one run
+
+def make_sizer(info: mt5.SymbolInfo):
+    """
+    Sizing of one symbol with its session constants bound once (contract size,
+    volume grid, profit currency), for loops that size the same symbol every pass.
+    Args:
+        info (mt5.SymbolInfo): Spec of the symbol, e.g. from _symbol_spec().
+    Returns:
+        Callable: size(budget_eur, price, eurusd_bid) -> volume rounded down to the
+            step, 0.0 when it is below volume_min. Without a EURUSD bid the budget
+            is used 1:1, as in eur_to_profit().
+    """
+    contract = info.trade_contract_size
+    step_u   = round(info.volume_step * _VOL_UNITS)
+    vmin     = info.volume_min
+    is_usd   = info.currency_profit == "USD"
+
+    def size(budget_eur: float, price: float, eurusd_bid: float | None) -> float:
+        budget_q = budget_eur / eurusd_bid if is_usd and eurusd_bid else budget_eur
+        vol = round(budget_q / (price * contract) * _VOL_UNITS) // step_u * step_u / _VOL_UNITS
+        return vol if vol >= vmin else 0.0
+    return size
+
+def _sizer(sizers: dict, sym: str, info: mt5.SymbolInfo):
+    """make_sizer() of `sym`, kept in `sizers` until its spec is refetched (new info object)."""
+    entry = sizers.get(sym)
+    if entry is None or entry[0] is not info:
+        entry = sizers[sym] = (info, make_sizer(info))
+    return entry[1]
+
+def _round_down_many(vol: np.ndarray, step: np.ndarray) -> np.ndarray:
+    """Round arrays of volumes *down* to their steps on the 1e-8 lot grid of _VOL_UNITS."""
+    n = np.round(step * _VOL_UNITS).astype(np.int64)
+    return np.round(vol * _VOL_UNITS).astype(np.int64) // n * n / _VOL_UNITS
+
+_EURUSD_TTL = 1.0                   # seconds a EURUSD bid is reused by _eurusd_bid()
+_EURUSD_LAST: tuple[float, float | None] = (-_EURUSD_TTL, None)   # (monotonic ts, bid)
 
 def _eurusd_bid():
+    # callers in the same second (sizing helpers, a pass over many symbols) share one tick
+    global _EURUSD_LAST
+    ts, bid = _EURUSD_LAST
+    now = time.monotonic()
+    if now - ts < _EURUSD_TTL:
+        return bid
     t = mt5.symbol_info_tick("EURUSD")
-    return t.bid if t and t.bid > 0 else None
+    bid = t.bid if t and t.bid > 0 else None
+    _EURUSD_LAST = (now, bid)
+    return bid
 
 def eur_to_profit(amount_eur: float, info: mt5.SymbolInfo, eurusd_bid: float | None) -> float:
     if info.currency_profit == "EUR" or eurusd_bid is None:
@@ -202,100 +372,61 @@ def profit_to_eur(amount_profit: float, info: mt5.SymbolInfo, eurusd_bid: float
         return amount_profit * eurusd_bid
     return amount_profit  # fallback conservative
 
-from zoneinfo import ZoneInfo  # if not already imported
-
-def _today_str() -> str:
-    tz = os.getenv("timezone", "Europe/Paris")
-    try:
-        now = datetime.now(ZoneInfo(tz))
-    except Exception:
-        now = datetime.now()
-    return now.strftime("%Y-%m-%d")
-
 def get_latest_trade_date(conn: sqlite3.Connection, strategy_id: int) -> str | None:
-    conn.row_factory = sqlite3.Row
     row = conn.execute(
         "SELECT MAX(date_opened) AS d FROM open_trades WHERE strategy_id = ?",
         (strategy_id,)
     ).fetchone()
-    return row["d"] if row and row["d"] else None
+    return row[0] if row and row[0] else None
 
-def get_m30_closes(symbol: str, bars: int = 300) -> np.ndarray | None:
-    """Fetch last N closes for M30 timeframe from MT5."""
-    info = mt5.symbol_info(symbol)
-    if info is None or (info and not info.visible):
-        if not mt5.symbol_select(symbol, True):
-            log.warning("%s – cannot add to Market Watch.", symbol); return None
+def get_m30_closes(symbol: str, bars: int = 300,
+                   out: np.ndarray | None = None) -> np.ndarray | None:
+    """
+    Fetch last N closes for M30 timeframe from MT5.
+    With `out` (a float64 buffer of at least `bars` slots) the closes are copied
+    into it and a view of it is returned instead of a new array.
+    """
+    if _symbol_spec(symbol) is None:
+        log.warning("%s – cannot add to Market Watch.", symbol); return None
 
     rates = mt5.copy_rates_from_pos(symbol, mt5.TIMEFRAME_M30, 0, bars)
     if rates is None or len(rates) < 110:        # need >= 100 for PercentRank
         log.warning("%s – not enough M30 bars (%s).", symbol, 0 if rates is None else len(rates)); return None
-    closes = np.array([r['close'] for r in rates], dtype=float)
-    return closes
+    # field of the structured array: one C-level copy/cast, no per-bar Python loop
+    if out is None:
+        return np.ascontiguousarray(rates['close'], dtype=np.float64)
+    dst = out[:len(rates)]          # the terminal may return fewer than `bars`
+    np.copyto(dst, rates['close'])
+    return dst
 
 # ── M30 data, pivots, ATR, volume ────────────────────────────────────────────
-def get_m30_rates(symbol: str, bars: int = 600):
-    info = mt5.symbol_info(symbol)
-    if info is None or not info.visible:
-        if not mt5.symbol_select(symbol, True):
-            log.warning("%s – cannot add to Market Watch.", symbol)
-            return None
-    # when loading:
-    rates_np = mt5.copy_rates_from_pos(...); 
-    if rates_np is None or len(rates_np) == 0: return None
-    rates = [{"time": int(r["time"]), "open": float(r["open"]), "high": float(r["high"]),
-            "low": float(r["low"]), "close": float(r["close"]), "tick_volume": int(r["tick_volume"])}
-            for r in rates_np]
-
-    #
-
-    # convert numpy recarray -> list[dict]
-    out = []
-    for r in rates_np:
-
-        if rates is None or len(rates) < 60:
-            log.warning("%s – insufficient M30 bars; skip.", sym)
-            continue
-        
-        out.append({
-            "time": int(r["time"]),
-            "open": float(r["open"]),
-            "high": float(r["high"]),
-            "low":  float(r["low"]),
-            "close": float(r["close"]),
-            "tick_volume": int(r["tick_volume"]),
-        })
-    return out
+def get_m30_rates(symbol: str, bars: int = 600) -> np.ndarray | None:
+    """
+    Last N M30 bars of `symbol` as the structured array MT5 returns (fields time,
+    open, high, low, close, tick_volume, …), or None without data.
+    Callers read whole columns (rates['high']) instead of per-bar dicts.
+    """
+    if _symbol_spec(symbol) is None:
+        log.warning("%s – cannot add to Market Watch.", symbol)
+        return None
+    rates = mt5.copy_rates_from_pos(symbol, mt5.TIMEFRAME_M30, 0, bars)
+    if rates is None or len(rates) == 0:
+        return None
+    return rates
 
 def _pivot_levels_from_rates(rates, left: int = 3, right: int = 3):
-    highs = [r['high'] for r in rates]
-    lows  = [r['low']  for r in rates]
-    n = len(rates)
-    if n < left + right + 3:
-        return None, None
-    res_levels, sup_levels = [], []
-    for i in range(left, n - right):
-        hi = highs[i]; lo = lows[i]
-        if all(hi >= highs[i-j] for j in range(1, left+1)) and all(hi >= highs[i+j] for j in range(1, right+1)):
-            res_levels.append(hi)
-        if all(lo <= lows[i-j] for j in range(1, left+1)) and all(lo <= lows[i+j] for j in range(1, right+1)):
-            sup_levels.append(lo)
-    return (res_levels[-1] if res_levels else None,
-            sup_levels[-1] if sup_levels else None)
+    """Last pivot high (resistance) and low (support) of the bars, see indicators.pivot_levels()."""
+    return pivot_levels(rates['high'], rates['low'], left, right)
 
 def _atr14_from_rates(rates):
-    import math
-    highs = [r['high'] for r in rates]
-    lows  = [r['low']  for r in rates]
-    closes= [r['close'] for r in rates]
-    trs = []
-    for i in range(1, len(rates)):
-        tr = max(highs[i]-lows[i], abs(highs[i]-closes[i-1]), abs(lows[i]-closes[i-1]))
-        trs.append(tr)
-    if len(trs) < 14:
+    # simple moving average of the last 14 true ranges (only the last 15 bars matter)
+    if len(rates) < 15:
         return None
-    # simple moving average of last 14 TRs
-    return sum(trs[-14:]) / 14.0
+    h = np.asarray(rates['high'][-14:],  dtype=np.float64)
+    l = np.asarray(rates['low'][-14:],   dtype=np.float64)
+    c = np.asarray(rates['close'][-15:-1], dtype=np.float64)   # previous closes
+    tr = np.maximum(h - l, np.maximum(np.abs(h - c), np.abs(l - c)))
+    return float(tr.sum()) / 14.0
 
 def _sl_tp_from_support(entry: float, support: float, rr: float = 2.0):
     sl = round(support, 2)
@@ -308,28 +439,22 @@ def _has_open_position(symbol: str, magic: int = 99) -> bool:
     if not poss: return False
     return any(p.magic == magic for p in poss)
 
-def _median(seq):
-    s = sorted(seq)
-    n = len(s)
-    if n == 0: return None
-    mid = n // 2
-    return (s[mid] if n % 2 else (s[mid-1]+s[mid]) / 2)
-
 def _vol_spike_ok(rates, mult: float = 1.5, lookback: int = 40, confirm_close: bool = True):
     """
     Volume filter: last closed bar tick_volume >= mult * median(tick_volume of prior N bars)
     If confirm_close=False, uses current forming bar; else uses previous (closed) bar.
     """
     if len(rates) < lookback + 5: return False
-    tv = [r['tick_volume'] for r in rates]
+    tv = rates['tick_volume']
     if confirm_close:
         cur_vol = tv[-2]   # last CLOSED bar
         base = tv[-(lookback+2):-2]
     else:
         cur_vol = tv[-1]   # current forming bar
         base = tv[-(lookback+1):-1]
-    med = _median(base)
-    if med is None or med <= 0: return False
+    if len(base) == 0: return False
+    med = np.median(base)   # O(n) partition, no sort of a Python list
+    if med <= 0: return False
     return cur_vol >= mult * med
 
 def _atr_buffer_pct(rates, min_buffer_pct: float = 0.10, atr_mult: float = 0.20):
@@ -339,12 +464,14 @@ def _atr_buffer_pct(rates, min_buffer_pct: float = 0.10, atr_mult: float = 0.20)
     """
     atr = _atr14_from_rates(rates)
     if not atr: return min_buffer_pct
-    last_close = rates[-2]['close'] if len(rates) >= 2 else rates[-1]['close']
+    last_close = float(rates['close'][-2 if len(rates) >= 2 else -1])
     atr_pct = (atr / max(1e-9, last_close)) * 100.0
     return max(min_buffer_pct, atr_pct * atr_mult)
 
 def _get_position(symbol: str, magic: int = 99):
-    poss = mt5.positions_get(symbol=symbol)
+    return _pick_position(mt5.positions_get(symbol=symbol), magic)
+
+def _pick_position(poss, magic: int = 99):
     if not poss:
         return None
     # Prefer our own positions (magic=99)
@@ -354,6 +481,20 @@ def _get_position(symbol: str, magic: int = 99):
     # fallback: any position on the symbol
     return poss[0]
 
+def _positions_by_symbol() -> dict[str, list]:
+    """All open positions from ONE positions_get() call, grouped by symbol."""
+    by_symbol = defaultdict(list)
+    for p in mt5.positions_get() or ():
+        by_symbol[p.symbol].append(p)
+    return by_symbol
+
+def _our_position(by_symbol: dict[str, list], symbol: str, magic: int = 99):
+    """Our (magic) position on `symbol` from a _positions_by_symbol() snapshot, or None."""
+    poss = by_symbol.get(symbol)
+    if not poss or not any(p.magic == magic for p in poss):
+        return None
+    return _pick_position(poss, magic)
+
 def _modify_sltp(symbol: str, sl: float | None, tp: float | None):
     req = {
         "action": mt5.TRADE_ACTION_SLTP,
@@ -364,11 +505,13 @@ def _modify_sltp(symbol: str, sl: float | None, tp: float | None):
     return mt5.order_send(req)
 
 
-def maybe_trail_position(conn, ticker: str, symbol: str, *, rr_trigger: float = 2.0, lock_rr: float = 0.5, magic: int = 99):
+def maybe_trail_position(conn, ticker: str, symbol: str, *, rr_trigger: float = 2.0, lock_rr: float = 0.5, magic: int = 99,
+                         pos=None):
     """
     If current R >= rr_trigger, move SL to entry + lock_rr * R_size.
     R_size = entry - initial_SL (from DB).
     Never decreases SL.
+    `pos` skips the per-symbol positions_get() when the caller already has the position.
     """
     # 1) fetch DB initial entry & SL (entry is the execution_price; initial SL is open_trades.stop_loss)
     c = conn.cursor()
@@ -385,11 +528,12 @@ def maybe_trail_position(conn, ticker: str, symbol: str, *, rr_trigger: float =
     r_size = max(1e-9, entry - initial_sl)  # initial risk
 
     # 2) get live price and current SL from MT5
-    pos = _get_position(symbol, magic=magic)
+    if pos is None:
+        pos = _get_position(symbol, magic=magic)
     if not pos:
         return
     tick = mt5.symbol_info_tick(symbol)
-    price = (tick.last or tick.bid or tick.ask) if tick else None
+    price = _best_price(tick)
     if not price:
         return
 
@@ -419,25 +563,25 @@ def minmax_volume(symbol: str, cash: float) -> float:
     Largest admissible volume of `symbol` that does not exceed `cash`.
     Returns 0 if even the minimum costs too much.
     """
-    info = mt5.symbol_info(symbol)
+    info = _symbol_spec(symbol)       # cached spec, symbol added to Market Watch if needed
     tick = mt5.symbol_info_tick(symbol)
     if not info or not tick or tick.ask <= 0:
         return 0                      # no price → trade impossible
 
-    price, vmin, vstep = tick.ask, info.volume_min, info.volume_step
-    min_cost = price * vmin
-    if min_cost > cash:               # too expensive even for 1 lot/share
+    # exact integer arithmetic: price in units of its last digit, volumes on the
+    # 1e-8 lot grid of _VOL_UNITS, cash rounded to the price's precision
+    # (round, not floor: 1110.35 * 100 is 111034.99999999999 in floats)
+    scale   = 10 ** info.digits
+    price_i = round(tick.ask * scale)
+    cash_i  = round(cash * scale) * _VOL_UNITS
+    vmin_u  = round(info.volume_min * _VOL_UNITS)
+    step_u  = round(info.volume_step * _VOL_UNITS)
+    if vmin_u * price_i > cash_i:     # too expensive even for 1 lot/share
         return 0
 
-    # how many step-increments fit into our budget?
-    raw = cash / price
-    steps = math.floor((raw - vmin) / vstep) + 1
-    vol = vmin + steps * vstep
-    # safety – never exceed the cash after rounding
-    while vol * price > cash + 1e-6:
-        vol -= vstep
-    # round to 2 decimals so both 1-share and 0.01-lot symbols are OK
-    return round(vol, 2)
+    # how many step-increments above vmin fit into our budget? (closed form, exact)
+    steps = (cash_i - vmin_u * price_i) // (step_u * price_i)
+    return (vmin_u + steps * step_u) / _VOL_UNITS
 
 def execute_strategy(
     strategy_id: int,
@@ -450,33 +594,23 @@ def execute_strategy(
     conn = get_conn()
 
     try:
-        raw_pending = fetch_pending(conn, strategy_id)
+        latest, raw_pending = fetch_pending(conn, strategy_id)
         if not raw_pending:
             log.info("No trades to execute.")
             return
         
-        # One row per normalized symbol
+        # One row per MT5 symbol (resolved once, kept on the row as "_sym");
+        # known tickers already carry it from the symbol_map JOIN
         uniq = {}
         for row in raw_pending:
-            sym = normalize_symbol(row["ticker"])
-            if sym not in uniq:
-                uniq[sym] = row
+            sym = row["_sym"] = row["mt5_symbol"] or resolve_mt5_symbol(conn, row["ticker"])
+            uniq.setdefault(sym, row)   # keep the first occurrence
         raw_pending = list(uniq.values())
 
         log.info("Using date=%s, %d tickers: %s",
-                get_latest_trade_date(conn, strategy_id),
+                latest,
                 len(raw_pending),
-                ", ".join(normalize_symbol(r["ticker"]) for r in raw_pending))
-
-
-        # ── De-duplicate by normalized symbol (one row per symbol) ─────────────
-        uniq_by_symbol = {}
-        for row in raw_pending:
-            sym = normalize_symbol(row["ticker"])
-            if sym not in uniq_by_symbol:
-                uniq_by_symbol[sym] = row   # keep the first occurrence
-        dedup_pending = list(uniq_by_symbol.values())
-        raw_pending = dedup_pending
+                ", ".join(uniq))
 
         eq_account  = mt5.account_info().equity
         working_cap = override_capital or eq_account
@@ -485,52 +619,58 @@ def execute_strategy(
         # ------------------------------------------------------------------
         # Phase 1 – prune symbols that can’t fit the per-position budget
         # ------------------------------------------------------------------
-        est_pp   = working_cap * leverage / len(raw_pending)
-        tradable = []
+        est_pp    = working_cap * leverage / len(raw_pending)
+        eurusd    = _eurusd_bid()   # one EURUSD quote for both phases
+        tradable  = []
+        skipped   = Counter()   # reason -> count; per-symbol skips are DEBUG, one summary at INFO
 
-        for row in raw_pending:
-            sym = normalize_symbol(row["ticker"])
-
-            # ── ensure the symbol is available & visible ────────────────
-            info = mt5.symbol_info(sym)
-            if info is None or not info.visible:
-                 if not mt5.symbol_select(sym, True):          # returns False on failure
-                    log.warning("%s – cannot add to Market Watch, skipping", sym)
-                    continue
-                 
+        # symbol_info / symbol_info_tick are terminal round-trips: probe a few symbols at once
+        with ThreadPoolExecutor(max_workers=PROBE_WORKERS) as ex:
+            probes = list(ex.map(_probe_symbol, [row["_sym"] for row in raw_pending]))
 
+        found = []   # (row, info, price) of every symbol MT5 knows; price NaN without a quote
+        for row, (info, tick) in zip(raw_pending, probes):
             if info is None:
-                log.warning("%s – symbol not available, skipping", sym)
+                log.debug("%s – symbol not available / cannot add to Market Watch, skipping", row["_sym"])
+                skipped["no_symbol"] += 1
                 continue
-
-            tick  = mt5.symbol_info_tick(sym)
-            price = (tick.last or tick.bid or tick.ask) if tick else None
-
-            price_str = "N/A" if price is None else f"{price:.2f}"
-            log.info(
-                "%s — p=%s  step=%g  min=%g  contract=%g",
-                sym, price_str, info.volume_step, info.volume_min,
-                info.trade_contract_size,
-            )
-
-            # need a tradable price ------------------------------------------------
-            if price is None or price <= 0:
-                log.warning("%s – no price, skipping", sym)
-                continue
-
-            # convert € budget to the symbol’s profit currency --------------------
-            budget_qccy = budget_in_quote_ccy(est_pp, info)
-
-            # can the very minimum lot fit into that budget? ----------------------
-            min_cost = price * info.volume_min * info.trade_contract_size
-            if min_cost > budget_qccy:
-                log.warning(
-                    "%s – min cost %.2f %s > budget %.2f € – skipping",
-                    sym, min_cost, info.currency_profit, est_pp
-                )
-                continue
-
-            tradable.append(row)
+            found.append((row, info, _best_price(tick) or np.nan))
+
+        if found:
+            # need a tradable price, and the very minimum lot must fit into the € budget
+            # converted to the symbol’s profit currency: one boolean mask over all symbols.
+            # columns: price, volume_min, volume_step, contract size
+            arr = np.array([
+                (price, info.volume_min, info.volume_step, info.trade_contract_size)
+                for _, info, price in found
+            ])
+            # € per profit-ccy unit: EURUSD for USD symbols, 1 otherwise (and without a quote)
+            is_usd = np.array([info.currency_profit == "USD" for _, info, _ in found])
+            fx = np.where(is_usd, eurusd, 1.0) if eurusd else np.ones(len(found))
+            min_cost  = arr[:, 0] * arr[:, 1] * arr[:, 3]
+            has_price = arr[:, 0] > 0                        # NaN compares False
+            fits      = has_price & (min_cost <= est_pp / fx)
+            skipped["no_price"]      = int(np.count_nonzero(~has_price))
+            skipped["too_expensive"] = int(np.count_nonzero(has_price & ~fits))
+
+            if log.isEnabledFor(logging.DEBUG):
+                for i in np.flatnonzero(~fits).tolist():
+                    row, info, _ = found[i]
+                    if has_price[i]:
+                        log.debug("%s – min cost %.2f %s > budget %.2f € – skipping",
+                                  row["_sym"], min_cost[i], info.currency_profit, est_pp)
+                    else:
+                        log.debug("%s – no price, skipping", row["_sym"])
+
+            for i in np.flatnonzero(fits).tolist():
+                row, info, price = found[i]
+                log.info("%s — p=%.2f  step=%g  min=%g  contract=%g",
+                         row["_sym"], price, info.volume_step, info.volume_min, info.trade_contract_size)
+                tradable.append(row)
+
+        log.info("Phase 1: %d accepted, %d skipped (no symbol %d, no price %d, too expensive %d)",
+                 len(tradable), sum(skipped.values()),
+                 skipped["no_symbol"], skipped["no_price"], skipped["too_expensive"])
 
         if not tradable:
             log.info("Nothing fits into the %.2f € budget per position.", est_pp)
@@ -541,92 +681,112 @@ def execute_strategy(
         # ------------------------------------------------------------------
         total_eur = working_cap * leverage
         cash_pp_eur = total_eur / len(tradable)
-        eurusd = _eurusd_bid()
-
-        # Gather symbol data once
-        syms = []
-        for row in tradable:
-            sym  = normalize_symbol(row["ticker"])
-            info = mt5.symbol_info(sym)
-            tick = mt5.symbol_info_tick(sym)
-            price = tick.last or tick.bid or tick.ask
-            vmin, vstep, contract = info.volume_min, info.volume_step, info.trade_contract_size
-
-            # initial volume from even split
-            budget_q = eur_to_profit(cash_pp_eur, info, eurusd)
-            raw_vol  = budget_q / (price * contract)
-            vol0     = max(vmin, round_down(raw_vol, vstep))
-
-            # monetary stats
-            step_cost_q   = price * contract * vstep
-            step_cost_eur = profit_to_eur(step_cost_q, info, eurusd)
-            min_cost_q    = price * contract * vmin
-            min_cost_eur  = profit_to_eur(min_cost_q, info, eurusd)
-            cost0_q       = price * contract * vol0
-            cost0_eur     = profit_to_eur(cost0_q, info, eurusd)
-
-            syms.append({
-                "row": row, "sym": sym, "info": info, "price": price,
-                "vmin": vmin, "vstep": vstep, "contract": contract,
-                "vol": vol0, "cost_eur": cost0_eur,
-                "step_eur": max(step_cost_eur, 1e-9),  # avoid zero
-            })
+
+        # Plan as parallel arrays, slot i ↔ tradable[i]: the Phase 1 columns of the
+        # symbols that fit (same order), no second round-trip or per-symbol loop
+        n = len(tradable)
+        price, vmin, vstep, contract = arr[fits].T
+        fx = fx[fits]
+        unit_cost = price * contract   # profit-ccy cost of 1.0 volume
+
+        # initial volume from even split, and its monetary stats in €
+        vol      = np.maximum(vmin, _round_down_many(cash_pp_eur / fx / unit_cost, vstep))
+        cost_eur = unit_cost * vol * fx
+        step_eur = np.maximum(unit_cost * vstep * fx, 1e-9)   # avoid zero
 
         # compute leftover and top-up greedily using the cheapest step first
-        spent_eur = sum(s["cost_eur"] for s in syms)
-        leftover = max(0.0, total_eur - spent_eur)
+        leftover = max(0.0, total_eur - float(cost_eur.sum()))
 
         # If some symbols rounded down too much, we can add steps while budget allows
         # Always respect volume_step; no max-volume constraint applied here.
-        if leftover > 0 and syms:
-            # Pre-sort by step cost; we’ll iterate in a cycle to distribute fairly
-            syms_sorted = sorted(syms, key=lambda x: x["step_eur"])
-            idx = 0
-            # hard cap iterations to avoid infinite loops due to tiny step costs
-            for _ in range(100000):
-                s = syms_sorted[idx]
-                step = s["vstep"]
-                if s["step_eur"] <= leftover + 1e-6:
-                    s["vol"] += step
-                    s["cost_eur"] += s["step_eur"]
-                    leftover -= s["step_eur"]
-                else:
-                    # if the cheapest step no longer fits, we’re done
-                    break
-                idx = (idx + 1) % len(syms_sorted)
+        if leftover > 0:
+            # Same allocation as handing out one step at a time round-robin, cheapest step
+            # first, until the next step no longer fits – in closed form: `rounds` full
+            # rounds over every symbol, then the longest cheapest-first prefix that still fits.
+            order    = np.argsort(step_eur, kind="stable")
+            cum      = np.cumsum(step_eur[order])
+            budget   = leftover + 1e-6
+            # the step cap only matters for degenerate (≈0 €) step costs
+            rounds   = min(int(budget // cum[-1]), _MAX_TOPUP_STEPS // n)
+            partial  = min(int(np.searchsorted(cum, budget - rounds * cum[-1], side="right")),
+                           _MAX_TOPUP_STEPS - rounds * n)
+            extra = np.full(n, rounds)
+            extra[order[:partial]] += 1
+            # rounded to the 1e-8 lot grid of _VOL_UNITS: drops the float noise of
+            # repeated additions without moving a volume min that is off the step grid
+            vol       = np.where(extra > 0, np.round(vol + extra * vstep, 8), vol)
+            cost_eur += extra * step_eur
 
         # Final: place ONE order per symbol with the planned volume
-        log.info("%d tradable symbols → planned spend ≈ %.2f € of %.2f € (leverage %.1f)",
-                 len(syms), sum(s["cost_eur"] for s in syms), total_eur, leverage)
-
-        placed = set()
-        for s in syms:
-            sym = s["sym"]
-            if sym in placed:
-                continue
-            qty = s["vol"]
-            if qty < s["vmin"]:
-                log.warning("%s – planned qty %g < min %g (skip)", sym, qty, s["vmin"])
+        if log.isEnabledFor(logging.INFO):
+            log.info("%d tradable symbols → planned spend ≈ %.2f € of %.2f € (leverage %.1f)",
+                     n, float(cost_eur.sum()), total_eur, leverage)
+
+        orders = []
+        for row, qty, qmin, est_cost in zip(tradable, vol.tolist(), vmin.tolist(), cost_eur.tolist()):
+            sym = row["_sym"]
+            if qty < qmin:
+                log.warning("%s – planned qty %g < min %g (skip)", sym, qty, qmin)
                 continue
 
-            side = s["row"]["side"].upper()
+            side = row["side"].upper()
             act  = "BUY" if side == "LONG" else "SELL"
 
-            est_cost = s["cost_eur"]
             log.info("%s %s %.4g (planned cost ≈ %.2f €)", act, sym, qty, est_cost)
+            orders.append((row, act, qty))
+
+        # order_send blocks on the terminal round-trip: keep a few in flight at once,
+        # paced by ORDER_LIMITER instead of a fixed sleep after every order
+        def _send(sym, act, qty):
+            ORDER_LIMITER.acquire()
+            return order_market(sym, act, qty)
+
+        # tickets open before dispatch: a position that is not among them afterwards
+        # was opened by this run
+        before = {p.ticket for p in mt5.positions_get() or ()} if orders else set()
+
+        # take the write lock before the first order: every fill of the run is then
+        # recorded in this one transaction without waiting on another writer mid-batch
+        if orders and not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")
+        lost = []   # (row, qty) whose order_send returned no result at all
+
+        with ThreadPoolExecutor(max_workers=ORDER_WORKERS) as ex:
+            futures = {ex.submit(_send, row["_sym"], act, qty): (row, qty) for row, act, qty in orders}
+            for fut in as_completed(futures):
+                row, qty = futures[fut]
+                sym = row["_sym"]
+                res = fut.result()
+                if res is None:
+                    lost.append((row, qty))
+                    continue
+                if res.retcode != mt5.TRADE_RETCODE_DONE:
+                    log.error("%s – order failed %s", sym, res)
+                    _forget_spec_on_reject(sym, res)
+                    continue
 
-            res = order_market(sym, act, qty)
-            if res is None or res.retcode != mt5.TRADE_RETCODE_DONE:
-                log.error("%s – order failed %s", sym, res)
-                continue
-
-            fill = res.price or 0.0
-            log.info("%s filled %.4g @ %.5f", sym, qty, fill)
-            placed.add(sym)
-            mark_filled(conn, s["row"]["id"], fill)
-            time.sleep(0.2)
+                fill = res.price or 0.0
+                log.info("%s filled %.4g @ %.5f", sym, qty, fill)
+                mark_filled(conn, row["id"], fill)   # DB stays on this thread
+
+        # No result means the IPC reply was lost, not that the order was: reconcile
+        # against one positions_get() so a fill is not sent again by the next run.
+        if lost:
+            opened = {p.symbol: p for p in mt5.positions_get() or ()
+                      if p.magic == 99 and p.ticket not in before}
+            for row, qty in lost:
+                sym = row["_sym"]
+                pos = opened.get(sym)
+                if pos is None:
+                    log.error("%s – order failed %s", sym, mt5.last_error())
+                    continue
+                log.info("%s filled %.4g @ %.5f (reconciled, ticket %s)",
+                         sym, pos.volume, pos.price_open, pos.ticket)
+                mark_filled(conn, row["id"], pos.price_open)
 
     finally:
+        # one commit for every fill of the run – also on errors, since those orders are live
+        conn.commit()
         shutdown_mt5()
 
 # ---------------------------------------------------------------------------
@@ -634,13 +794,8 @@ def execute_strategy(
 # ---------------------------------------------------------------------------
 
 def _now_in_tz() -> datetime:
-    load_dotenv()
-    tz = os.getenv("timezone", "Europe/Paris")
-    try:
-        return datetime.now(ZoneInfo(tz))
-    except Exception:
-        # Fallback: naive local time if zoneinfo missing; still works
-        return datetime.now()
+    # _TZ is None (→ naive local time) if the zone could not be loaded; still works
+    return datetime.now(_TZ)
 
 def is_eod_window() -> bool:
     """
@@ -649,15 +804,13 @@ def is_eod_window() -> bool:
     Adjust if you prefer a different window.
     """
     now = _now_in_tz().time()
-    return (now >= datetime.strptime("21:55","%H:%M").time() and
-            now <= datetime.strptime("23:30","%H:%M").time())
+    return _EOD_START <= now <= _EOD_END
 
 def get_symbols_for_strategy(conn: sqlite3.Connection, strategy_id: int) -> list[str]:
     """
     Symbols to manage for this strategy. We use rows that are 'executed=1'
     since those were actually sent to market (see mark_filled()).
     """
-    conn.row_factory = sqlite3.Row
     rows = conn.execute(
         """SELECT DISTINCT ticker
              FROM open_trades
@@ -665,7 +818,7 @@ def get_symbols_for_strategy(conn: sqlite3.Connection, strategy_id: int) -> list
               AND executed = 1""",
         (strategy_id,),
     ).fetchall()
-    return [normalize_symbol(r["ticker"]) for r in rows]
+    return [normalize_symbol(r[0]) for r in rows]
 
 def close_strategy_positions(strategy_id: int, *, force: bool = False, deviation: int = 10) -> None:
     """
@@ -691,26 +844,25 @@ def close_strategy_positions(strategy_id: int, *, force: bool = False, deviation
 
         log.info("Closing %d position(s) (magic=99) ...", len(to_close))
 
-        for pos in to_close:
-            if pos.type == mt5.POSITION_TYPE_BUY:
-                close_type = mt5.ORDER_TYPE_SELL
-                side_str   = "SELL"
-            else:
-                close_type = mt5.ORDER_TYPE_BUY
-                side_str   = "BUY"
-
-            req = {
-                "action"      : mt5.TRADE_ACTION_DEAL,
-                "symbol"      : pos.symbol,
-                "volume"      : pos.volume,
-                "type"        : close_type,
-                "position"    : pos.ticket,
-                "deviation"   : deviation,
-                "magic"       : 99,
-                "comment"     : "auto-close",
-                "type_filling": mt5.ORDER_FILLING_IOC,
-            }
-            res = mt5.order_send(req)
+        reqs = [_CLOSE_TMPL | {
+                    "symbol"   : pos.symbol,
+                    "volume"   : pos.volume,
+                    "type"     : _CLOSE_TYPE[pos.type],
+                    "position" : pos.ticket,
+                    "deviation": deviation,
+                } for pos in to_close]
+
+        # every close is sent within a few round-trips instead of one after another,
+        # at the ORDER_LIMITER rate shared with execute_strategy
+        def _send(req):
+            ORDER_LIMITER.acquire()
+            return mt5.order_send(req)
+
+        with ThreadPoolExecutor(max_workers=ORDER_WORKERS) as ex:
+            results = list(ex.map(_send, reqs))
+
+        for pos, req, res in zip(to_close, reqs, results):
+            side_str = "SELL" if req["type"] == mt5.ORDER_TYPE_SELL else "BUY"
             if res and res.retcode == mt5.TRADE_RETCODE_DONE:
                 log.info("Closed %s %.4g %s @ %.5f (ticket %s)",
                          side_str, pos.volume, pos.symbol, res.price or 0.0, pos.ticket)
@@ -720,19 +872,23 @@ def close_strategy_positions(strategy_id: int, *, force: bool = False, deviation
     finally:
         shutdown_mt5()
 
-def _in_session_paris(start="15:30", end="22:00") -> bool:
+def _hhmm(t: str | dt_time) -> dt_time:
+    """'HH:MM' → time (time objects pass through), so callers can parse once up front."""
+    if isinstance(t, dt_time):
+        return t
+    h, m = map(int, t.split(":"))
+    return dt_time(hour=h, minute=m)
+
+def _in_session_paris(start: str | dt_time = "15:30", end: str | dt_time = "22:00") -> bool:
     """
     Return True if current Paris local time is within [start, end].
-    Handles windows that cross midnight as well.
+    Handles windows that cross midnight as well. The watchers pass time objects
+    parsed once with _hhmm() instead of re-parsing the strings every poll.
     """
-    tz = ZoneInfo(os.getenv("timezone", "Europe/Paris"))
-    now_t = datetime.now(tz).time()
-
-    s_h, s_m = map(int, start.split(":"))
-    e_h, e_m = map(int, end.split(":"))
+    now_t = _now_in_tz().time()
 
-    start_t = dt_time(hour=s_h, minute=s_m)
-    end_t   = dt_time(hour=e_h, minute=e_m)
+    start_t = _hhmm(start)
+    end_t   = _hhmm(end)
 
     if start_t <= end_t:
         # normal same-day window
@@ -742,67 +898,129 @@ def _in_session_paris(start="15:30", end="22:00") -> bool:
         return now_t >= start_t or now_t <= end_t
     
 def _today_paris_str() -> str:
-    from zoneinfo import ZoneInfo
-    from datetime import datetime
-    tz = ZoneInfo(os.getenv("timezone", "Europe/Paris"))
-    return datetime.now(tz).strftime("%Y-%m-%d")
+    return _now_in_tz().strftime("%Y-%m-%d")
+
+def _sleep_rest_of(poll_seconds: float, started: float) -> None:
+    """Sleep what is left of a poll interval that began at time.monotonic() `started`,
+    so a pass that takes a while does not push every later pass back by that long."""
+    time.sleep(max(0.0, poll_seconds - (time.monotonic() - started)))
 
 def enqueue_signal_queue(conn, strategy_id: int, tickers: list[str]) -> None:
+    """
+    Queue (or re-arm) tickers for today's session.
+    The whole batch is one executemany inside a single transaction → one commit,
+    not one per ticker; the UNIQUE(ticker, strategy_id, date_queued) key drives the upsert.
+    """
     today = _today_paris_str()
-    cur = conn.cursor()
-    for t in tickers:
-        cur.execute("""
-            INSERT INTO signal_queue (ticker, strategy_id, date_queued, status, last_crsi, last_checked)
-            VALUES (?, ?, ?, 'PENDING', NULL, NULL)
-            ON CONFLICT(ticker, strategy_id, date_queued) DO UPDATE SET
-                status='PENDING', last_crsi=NULL, last_checked=NULL
-        """, (t, strategy_id, today))
+    rows = [(t, strategy_id, today) for t in tickers]
+    conn.executemany("""
+        INSERT INTO signal_queue (ticker, strategy_id, date_queued, status, last_crsi, last_checked)
+        VALUES (?, ?, ?, 'PENDING', NULL, NULL)
+        ON CONFLICT(ticker, strategy_id, date_queued) DO UPDATE SET
+            status='PENDING', last_crsi=NULL, last_checked=NULL
+    """, rows)
     conn.commit()
 
 
 def _get_latest_queue_date(conn, strategy_id: int) -> str | None:
-    conn.row_factory = sqlite3.Row
     row = conn.execute(
         "SELECT MAX(date_queued) AS d FROM signal_queue WHERE strategy_id = ?",
         (strategy_id,)
     ).fetchone()
-    return row["d"] if row and row["d"] else None
+    return row[0] if row and row[0] else None
+
+# watcher statements as constants: the same SQL string is served from sqlite3's statement cache
+_PENDING_QUEUE_SQL = """
+    SELECT id, ticker, status, last_crsi
+      FROM signal_queue
+     WHERE strategy_id = ? AND date_queued = ? AND status = 'PENDING'
+"""
+_MARK_ENTERED_SQL = "UPDATE signal_queue SET status='ENTERED', last_crsi=?, last_checked=CURRENT_TIMESTAMP WHERE id=?"
+_UPDATE_CRSI_SQL  = "UPDATE signal_queue SET last_crsi=?, last_checked=CURRENT_TIMESTAMP WHERE id=?"
+_INSERT_CRSI_ENTRY_SQL = """
+    INSERT INTO open_trades (ticker, entry_price, stop_loss, target_price, date_opened, strategy_id)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+# SR30 fills are recorded as executed at their fill price
+_INSERT_SR30_ENTRY_SQL = """
+    INSERT INTO open_trades
+        (ticker, entry_price, stop_loss, target_price, date_opened,
+         strategy_id, executed, execution_price, execution_time)
+    VALUES (?, ?, ?, ?, ?, ?, 1, ?, CURRENT_TIMESTAMP)
+"""
 
 def fetch_pending_queue(conn, strategy_id: int) -> list[dict]:
     """Prefer today's PENDING queue; if empty, fall back to the latest queue date."""
-    conn.row_factory = sqlite3.Row
     today = _today_paris_str()
-    rows = conn.execute("""
-        SELECT id, ticker, status, last_crsi
-          FROM signal_queue
-         WHERE strategy_id = ? AND date_queued = ? AND status = 'PENDING'
-    """, (strategy_id, today)).fetchall()
+    rows = _dict_rows(conn, _PENDING_QUEUE_SQL, (strategy_id, today))
 
     if rows:
-        return [dict(r) for r in rows]
+        return rows
 
     # fallback — use the last available date for this strategy
     latest = _get_latest_queue_date(conn, strategy_id)
     if not latest or latest == today:
-        return [dict(r) for r in rows]  # stay empty if none
-    rows = conn.execute("""
-        SELECT id, ticker, status, last_crsi
-          FROM signal_queue
-         WHERE strategy_id = ? AND date_queued = ? AND status = 'PENDING'
-    """, (strategy_id, latest)).fetchall()
+        return rows  # stay empty if none
+    rows = _dict_rows(conn, _PENDING_QUEUE_SQL, (strategy_id, latest))
     if rows:
         log.warning("No queue for today; falling back to latest date %s.", latest)
-    return [dict(r) for r in rows]
+    return rows
 
-def mark_queue_entered(conn, q_id: int, crsi_val: float):
-    conn.execute("""UPDATE signal_queue SET status='ENTERED', last_crsi=?, last_checked=CURRENT_TIMESTAMP WHERE id=?""",
-                 (crsi_val, q_id))
-    conn.commit()
+def record_watcher_pass(conn, entries: list[tuple], entered: list[tuple[float, int]],
+                        crsi_updates: list[tuple[float, int]], *,
+                        insert_sql: str = _INSERT_CRSI_ENTRY_SQL):
+    """
+    Write one watcher pass in a single transaction (one commit): the open_trades
+    rows of its fills (`insert_sql` parameters), the queue rows marked ENTERED, and
+    the CRSI / last_checked of every other checked row. Also commits when the batches
+    are empty: resolve_mt5_symbol()'s symbol_map insert may have opened the transaction,
+    and it must not hold the write lock across the sleep until the next pass.
+    """
+    if not (entries or entered or crsi_updates):
+        if conn.in_transaction:
+            conn.commit()
+        return
+    with conn:
+        conn.executemany(insert_sql, entries)
+        conn.executemany(_UPDATE_CRSI_SQL, crsi_updates)
+        conn.executemany(_MARK_ENTERED_SQL, entered)
+
+def fetch_all_m30_closes(symbols: list[str], bars: int = 300, *,
+                         pool: ThreadPoolExecutor | None = None,
+                         buffers: dict[str, np.ndarray] | None = None) -> dict[str, np.ndarray]:
+    """
+    get_m30_closes() for many symbols, the copy_rates_from_pos calls in flight at once.
+    Symbols without enough bars are left out of the result.
+    With `buffers`, each symbol's closes are written into its own reusable array
+    (created on first use), so the returned arrays are only valid until the next call.
+    """
+    if pool is None:
+        with ThreadPoolExecutor(max_workers=max(1, min(16, len(symbols)))) as own:
+            return fetch_all_m30_closes(symbols, bars, pool=own, buffers=buffers)
+    outs = ([buffers.setdefault(sym, np.empty(bars, dtype=np.float64)) for sym in symbols]
+            if buffers is not None else [None] * len(symbols))
+    closes = pool.map(get_m30_closes, symbols, [bars] * len(symbols), outs)
+    return {sym: c for sym, c in zip(symbols, closes) if c is not None}
+
+def _crsi_probe(sym: str, closes: np.ndarray):
+    """
+    Quote and CRSI for one queued symbol of the CRSI watcher, from its M30 `closes`.
+    Runs on a worker thread (no DB access). Returns (SymbolInfo, price, crsi), or a
+    skip reason.
+    """
+    info = _symbol_spec(sym)   # cached after the first pass: only the tick is fetched
+    if info is None:
+        return "symbol_select failed; skipping this pass."
 
-def update_queue_crsi(conn, q_id: int, crsi_val: float):
-    conn.execute("""UPDATE signal_queue SET last_crsi=?, last_checked=CURRENT_TIMESTAMP WHERE id=?""",
-                 (crsi_val, q_id))
-    conn.commit()
+    tick = mt5.symbol_info_tick(sym)
+    if not tick:
+        return "skipping: no symbol info or tick."
+
+    price = _best_price(tick)
+    if not price:
+        return "skipping: no price."
+
+    return info, price, connors_rsi_last(closes)   # only the live bar is needed
 
 def monitor_crsi_and_execute(strategy_id: int,
                              per_position_eur: float,
@@ -818,11 +1036,16 @@ def monitor_crsi_and_execute(strategy_id: int,
     """
     initialize_mt5()
     conn = get_conn()
+    pool = ThreadPoolExecutor(max_workers=PROBE_WORKERS)   # per-symbol MT5 reads, reused every pass
+    session_start, session_end = _hhmm(session_start), _hhmm(session_end)
+    closes_buf: dict[str, np.ndarray] = {}   # per-symbol closes, overwritten every pass
+    sizers: dict[str, tuple] = {}            # sym -> (SymbolInfo, make_sizer(info))
     try:
         log.info("CRSI watcher start: strat=%d, budget/pos=%.2f€, thr=%.1f on M30", strategy_id, per_position_eur, threshold)
 
         # derive EURUSD for budgeting once per loop
         while True:
+            started = time.monotonic()
             if not _in_session_paris(session_start, session_end):
                 time.sleep(poll_seconds)
                 continue
@@ -836,12 +1059,12 @@ def monitor_crsi_and_execute(strategy_id: int,
                 time.sleep(poll_seconds)
                 continue
 
-            eurusd = mt5.symbol_info_tick("EURUSD")
-            eurusd_bid = eurusd.bid if eurusd and eurusd.bid > 0 else None
+            eurusd_bid = _eurusd_bid()   # one quote per pass, shared by every row below
 
+            # --- Resolve symbols (DB, this thread) ---
+            resolved = []
             for row in queue:
-                # --- Resolve symbol ---
-                sym = resolve_mt5_symbol(conn, row["ticker"]) if 'resolve_mt5_symbol' in globals() else normalize_symbol(row["ticker"])
+                sym = resolve_mt5_symbol(conn, row["ticker"])
                 if not sym:
                     log.warning("%s – cannot resolve MT5 symbol; cancelling from queue.", row["ticker"])
                     conn.execute("""
@@ -852,88 +1075,75 @@ def monitor_crsi_and_execute(strategy_id: int,
                     """, (row["id"],))
                     conn.commit()
                     continue
+                resolved.append((row, sym))
+
+            # --- Bars for every symbol at once, then quote + CRSI for those with data ---
+            # (terminal round-trips, so both stages run on the pool)
+            closes_by_sym = fetch_all_m30_closes([sym for _, sym in resolved], 300,
+                                                 pool=pool, buffers=closes_buf)
+            resolved = [(row, sym) for row, sym in resolved if sym in closes_by_sym]
+            probes = pool.map(_crsi_probe, [sym for _, sym in resolved],
+                              [closes_by_sym[sym] for _, sym in resolved])
+            # written in one transaction after the pass (also if it stops half-way,
+            # so filled rows are never left PENDING and re-entered on the next pass)
+            crsi_updates = []   # (crsi, queue_id) of every checked row
+            entries      = []   # open_trades rows of this pass's fills
+            entered      = []   # (crsi, queue_id) of the rows those fills came from
+            date_opened  = _today_paris_str()
 
-                # --- Ensure visibility ---
-                if not (mt5.symbol_info(sym) and mt5.symbol_info(sym).visible):
-                    if not mt5.symbol_select(sym, True):
-                        log.warning("%s – symbol_select failed; skipping this pass.", sym)
+            try:
+                for (row, sym), probe in zip(resolved, probes):
+                    if isinstance(probe, str):
+                        log.warning("%s – %s", sym, probe)
                         continue
+                    info, price, crsi = probe
 
-                # --- Get 30m closes ---
-                closes = get_m30_closes(sym, bars=300)
-                if closes is None:
-                    log.warning("%s – skipping: not enough M30 bars / data unavailable.", sym)
-                    continue
-
-                info = mt5.symbol_info(sym)
-                tick = mt5.symbol_info_tick(sym)
-                if not info or not tick:
-                    log.warning("%s – skipping: no symbol info or tick.", sym)
-                    continue
-
-                price = tick.last or tick.bid or tick.ask
-                if not price:
-                    log.warning("%s – skipping: no price.", sym)
-                    continue
-
-                # --- Compute CRSI ---
-                crsi = connors_rsi_30m(closes)[-1]
-                update_queue_crsi(conn, row["id"], float(crsi))
-                log.info("%s M30 CRSI=%.2f", sym, crsi)
+                    crsi_updates.append((crsi, row["id"]))
+                    log.info("%s M30 CRSI=%.2f", sym, crsi)
 
-                # --- Threshold check ---
-                if crsi >= threshold:
-                    continue
+                    # --- Threshold check ---
+                    if crsi >= threshold:
+                        continue
 
-                # Size with your existing sizing rules (fixed € per pos, round to step)
-                info = mt5.symbol_info(sym)
-                tick = mt5.symbol_info_tick(sym)
-                if not info or not tick: 
-                    continue
-                price = tick.last or tick.bid or tick.ask
-                # convert EUR budget to symbol's profit currency
-                budget_qccy = budget_in_quote_ccy(per_position_eur, info)
-                raw_vol = budget_qccy / (price * info.trade_contract_size)
-                qty = round_down(raw_vol, info.volume_step)
-                if qty < info.volume_min:
-                    log.warning("%s – qty rounds to < min; skip", sym)
-                    continue
+                    # Size with your existing sizing rules (fixed € per pos, round to step)
+                    # (info and price come from this pass's probe; EUR budget converted
+                    # to the symbol's profit currency)
+                    qty = _sizer(sizers, sym, info)(per_position_eur, price, eurusd_bid)
+                    if not qty:
+                        log.warning("%s – qty rounds to < min; skip", sym)
+                        continue
 
-                side = "BUY"  # your strategy is long-only today; adapt if needed
-                res = order_market(sym, side, qty)
-                if res is None or res.retcode != mt5.TRADE_RETCODE_DONE:
-                    log.error("%s – order failed %s", sym, res)
-                    continue
+                    side = "BUY"  # your strategy is long-only today; adapt if needed
+                    ORDER_LIMITER.acquire()   # only waits when orders burst past the broker's rate
+                    res = order_market(sym, side, qty)
+                    if res is None or res.retcode != mt5.TRADE_RETCODE_DONE:
+                        log.error("%s – order failed %s", sym, res)
+                        _forget_spec_on_reject(sym, res)
+                        continue
 
-                fill = res.price or price
-                log.info("ENTER %s %.4g @ %.5f (CRSI %.2f)", sym, qty, fill, crsi)
-
-                # write to open_trades (compute SL/TP exactly like you do now)
-                c = conn.cursor()
-                # Read price targets (already in your DB via main.py)
-                pt = c.execute("SELECT average_price FROM price_targets WHERE ticker = ?", (row["ticker"],)).fetchone()
-                if not pt:  # fallback SL/TP (e.g., 1R) if no price target is present
-                    sl = round(fill * 0.95, 2)
-                    tp = round(fill * 1.05, 2)
-                else:
-                    avg = float(pt[0])
-                    tgt_pct = (avg - fill) / fill
-                    sl = round(fill * (1 - tgt_pct), 2)
-                    tp = round(fill * (1 + tgt_pct), 2)
-
-                date_opened = _today_paris_str()
-                c.execute("""
-                    INSERT INTO open_trades (ticker, entry_price, stop_loss, target_price, date_opened, strategy_id)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (row["ticker"], float(fill), float(sl), float(tp), date_opened, strategy_id))
-                conn.commit()
-
-                mark_queue_entered(conn, row["id"], float(crsi))
-                time.sleep(0.2)
-
-            time.sleep(poll_seconds)
+                    fill = res.price or price
+                    log.info("ENTER %s %.4g @ %.5f (CRSI %.2f)", sym, qty, fill, crsi)
+
+                    # SL/TP for the open_trades row (computed exactly like you do now)
+                    c = conn.cursor()
+                    # Read price targets (already in your DB via main.py)
+                    pt = c.execute("SELECT average_price FROM price_targets WHERE ticker = ?", (row["ticker"],)).fetchone()
+                    if not pt:  # fallback SL/TP (e.g., 1R) if no price target is present
+                        sl = round(fill * 0.95, 2)
+                        tp = round(fill * 1.05, 2)
+                    else:
+                        avg = float(pt[0])
+                        tgt_pct = (avg - fill) / fill
+                        sl = round(fill * (1 - tgt_pct), 2)
+                        tp = round(fill * (1 + tgt_pct), 2)
+
+                    entries.append((row["ticker"], float(fill), float(sl), float(tp), date_opened, strategy_id))
+                    entered.append((float(crsi), row["id"]))
+            finally:
+                record_watcher_pass(conn, entries, entered, crsi_updates)
+            _sleep_rest_of(poll_seconds, started)
     finally:
-        conn.close()
+        pool.shutdown(wait=False, cancel_futures=True)
         shutdown_mt5()
 
 def monitor_sr30_and_execute(
@@ -967,9 +1177,11 @@ def monitor_sr30_and_execute(
                  strategy_id, per_position_eur, pivot_left, pivot_right, min_buffer_pct, atr_buffer_mult,
                  use_volume_filter, vol_mult, vol_lookback, confirm_close)
 
-        eurusd_bid = _eurusd_bid()
+        session_start, session_end = _hhmm(session_start), _hhmm(session_end)
+        sizers: dict[str, tuple] = {}   # sym -> (SymbolInfo, make_sizer(info))
 
         while True:
+            started = time.monotonic()
             if not _in_session_paris(session_start, session_end):
                 time.sleep(poll_seconds); continue
 
@@ -981,120 +1193,115 @@ def monitor_sr30_and_execute(
                 time.sleep(poll_seconds)
                 continue
 
+            eurusd_bid = _eurusd_bid()   # one quote per pass, shared by every row below
 
-            for row in queue:
-                sym = normalize_symbol(row["ticker"])
-                if not (mt5.symbol_info(sym) and mt5.symbol_info(sym).visible):
-                    if not mt5.symbol_select(sym, True):
-                        log.warning("%s – symbol_select failed; skip.", sym); continue
+            # written in one transaction after the pass (also if it stops half-way),
+            # like the CRSI watcher's
+            checked     = []   # (nan, queue_id): checked, no breakout
+            entries     = []   # open_trades rows of this pass's fills
+            entered     = []   # (nan, queue_id): filled now or already held
+            date_opened = _today_paris_str()
+            syms        = [normalize_symbol(row["ticker"]) for row in queue]   # once per pass
 
-                rates = get_m30_rates(sym, bars=600)
-                if rates is None or len(rates) < 60:   # or whatever minimum you need
-                    log.warning("%s – insufficient M30 bars; skip.", sym)
-                    continue
+            try:
+                for row, sym in zip(queue, syms):
+                    if _symbol_spec(sym) is None:
+                        log.warning("%s – symbol_select failed; skip.", sym); continue
 
+                    rates = get_m30_rates(sym, bars=600)
+                    if rates is None or len(rates) < 60:   # or whatever minimum you need
+                        log.warning("%s – insufficient M30 bars; skip.", sym)
+                        continue
 
-                res, sup = _pivot_levels_from_rates(rates, pivot_left, pivot_right)
-                if not res or not sup or sup >= res:
-                    update_queue_crsi(conn, row["id"], float("nan"));  # reuse as last_checked
-                    continue
+                    res, sup = _pivot_levels_from_rates(rates, pivot_left, pivot_right)
+                    if not res or not sup or sup >= res:
+                        checked.append((float("nan"), row["id"]))   # reuse as last_checked
+                        continue
 
-                # buffer
-                buf_pct = (_atr_buffer_pct(rates, min_buffer_pct, atr_buffer_mult) if use_atr_buffer
-                           else min_buffer_pct)
-                trigger = res * (1.0 + buf_pct / 100.0)
-
-                # price to check: closed candle or live tick
-                if confirm_close:
-                    # act only if the last CLOSED candle's close broke out
-                    last_closed_close = rates[-2]['close']
-                    price_ok = last_closed_close > trigger
-                    entry_price = last_closed_close
-                else:
-                    tick = mt5.symbol_info_tick(sym)
-                    px = (tick.last or tick.bid or tick.ask) if tick else None
-                    if not px: continue
-                    price_ok = px > trigger
-                    entry_price = px
-
-                # optional volume spike on the breakout bar
-                if use_volume_filter and price_ok:
-                    if not _vol_spike_ok(rates, mult=vol_mult, lookback=vol_lookback, confirm_close=confirm_close):
-                        price_ok = False
-
-                if not price_ok:
-                    update_queue_crsi(conn, row["id"], float("nan"))
-                    continue
+                    # buffer
+                    buf_pct = (_atr_buffer_pct(rates, min_buffer_pct, atr_buffer_mult) if use_atr_buffer
+                               else min_buffer_pct)
+                    trigger = res * (1.0 + buf_pct / 100.0)
+
+                    # price to check: closed candle or live tick
+                    if confirm_close:
+                        # act only if the last CLOSED candle's close broke out
+                        last_closed_close = float(rates['close'][-2])
+                        price_ok = last_closed_close > trigger
+                        entry_price = last_closed_close
+                    else:
+                        tick = mt5.symbol_info_tick(sym)
+                        px = _best_price(tick)
+                        if not px: continue
+                        price_ok = px > trigger
+                        entry_price = px
+
+                    # optional volume spike on the breakout bar
+                    if use_volume_filter and price_ok:
+                        if not _vol_spike_ok(rates, mult=vol_mult, lookback=vol_lookback, confirm_close=confirm_close):
+                            price_ok = False
+
+                    if not price_ok:
+                        checked.append((float("nan"), row["id"]))
+                        continue
 
-                # dedupe
-                if _has_open_position(sym, 99):
-                    log.info("%s – already open (magic=99).", sym)
-                    mark_queue_entered(conn, row["id"], float("nan"))
-                    continue
+                    # dedupe
+                    if _has_open_position(sym, 99):
+                        log.info("%s – already open (magic=99).", sym)
+                        entered.append((float("nan"), row["id"]))
+                        continue
 
-                sl, tp = _sl_tp_from_support(entry_price, sup, rr=rr)
-                if sl >= entry_price or tp <= entry_price:
-                    continue
+                    sl, tp = _sl_tp_from_support(entry_price, sup, rr=rr)
+                    if sl >= entry_price or tp <= entry_price:
+                        continue
 
-                info = mt5.symbol_info(sym)
-                if not info: continue
-                contract = info.trade_contract_size
-                budget_q = eur_to_profit(per_position_eur, info, eurusd_bid)
-                raw_vol  = budget_q / (entry_price * contract)
-                qty      = round_down(raw_vol, info.volume_step)
-                if qty < info.volume_min:
-                    log.warning("%s – qty < min; skip", sym); continue
-
-                req = {
-                    "action": mt5.TRADE_ACTION_DEAL,
-                    "symbol": sym,
-                    "volume": qty,
-                    "type": mt5.ORDER_TYPE_BUY,
-                    "deviation": 10,
-                    "type_filling": mt5.ORDER_FILLING_IOC,
-                    "magic": 99,
-                    "comment": "sr30-breakout",
-                    "sl": sl,
-                    "tp": tp,
-                }
-                res_send = mt5.order_send(req)
-                if res_send is None or res_send.retcode != mt5.TRADE_RETCODE_DONE:
-                    log.error("%s – order failed %s", sym, res_send); continue
-
-                fill = res_send.price or entry_price
-                log.info("ENTER %s %.4g @ %.5f | SL %.2f TP %.2f | buf=%.3f%% vol=%s",
-                         sym, qty, fill, sl, tp, buf_pct, "Y" if use_volume_filter else "N")
-
-                # record
-                c = conn.cursor()
-                c.execute("""
-                    INSERT INTO open_trades
-                        (ticker, entry_price, stop_loss, target_price, date_opened,
-                         strategy_id, executed, execution_price, execution_time)
-                    VALUES (?, ?, ?, ?, ?, ?, 1, ?, CURRENT_TIMESTAMP)
-                """, (row["ticker"], float(fill), float(sl), float(tp),
-                      _today_paris_str(), strategy_id, float(fill)))
-                conn.commit()
-
-                mark_queue_entered(conn, row["id"], float("nan"))
-                time.sleep(0.2)
+                    info = _symbol_spec(sym)
+                    if not info: continue
+                    qty = _sizer(sizers, sym, info)(per_position_eur, entry_price, eurusd_bid)
+                    if not qty:
+                        log.warning("%s – qty < min; skip", sym); continue
+
+                    req = _SR30_TMPL | {
+                        "symbol"   : sym,
+                        "volume"   : qty,
+                        "deviation": 10,
+                        "sl"       : sl,
+                        "tp"       : tp,
+                    }
+                    ORDER_LIMITER.acquire()   # only waits when orders burst past the broker's rate
+                    res_send = mt5.order_send(req)
+                    if res_send is None or res_send.retcode != mt5.TRADE_RETCODE_DONE:
+                        log.error("%s – order failed %s", sym, res_send)
+                        _forget_spec_on_reject(sym, res_send); continue
+
+                    fill = res_send.price or entry_price
+                    log.info("ENTER %s %.4g @ %.5f | SL %.2f TP %.2f | buf=%.3f%% vol=%s",
+                             sym, qty, fill, sl, tp, buf_pct, "Y" if use_volume_filter else "N")
+
+                    # record (written with the rest of the pass)
+                    entries.append((row["ticker"], float(fill), float(sl), float(tp),
+                                    date_opened, strategy_id, float(fill)))
+                    entered.append((float("nan"), row["id"]))
+            finally:
+                record_watcher_pass(conn, entries, entered, checked,
+                                    insert_sql=_INSERT_SR30_ENTRY_SQL)
 
             # after processing entries for each symbol in queue, add:
             try:
                 # run trailing check on all queued symbols we might hold
-                for row in queue:
-                    sym = normalize_symbol(row["ticker"])
-                    if _has_open_position(sym, 99):
+                by_sym = _positions_by_symbol()   # one IPC call for the whole pass
+                for row, sym in zip(queue, syms):
+                    pos = _our_position(by_sym, sym, 99)
+                    if pos:
                         maybe_trail_position(conn, row["ticker"], sym,
                                             rr_trigger=2.0,   # make configurable if you like
                                             lock_rr=0.5,     # lock +0.5R
-                                            magic=99)
+                                            magic=99, pos=pos)
             except Exception as e:
                 log.warning("Trailing pass error: %s", e)
 
-            time.sleep(poll_seconds)
+            _sleep_rest_of(poll_seconds, started)
     finally:
-        conn.close()
         shutdown_mt5()
 
 def manage_trailing_stops(strategy_id: int, *, rr_trigger: float = 2.0, lock_rr: float = 0.5, poll_seconds: int = 20):
@@ -1106,6 +1313,7 @@ def manage_trailing_stops(strategy_id: int, *, rr_trigger: float = 2.0, lock_rr:
     try:
         log.info("Trailing manager start: strat=%d, trigger=%.1fR lock=%.1fR", strategy_id, rr_trigger, lock_rr)
         while True:
+            started = time.monotonic()
             # read current open tickers for this strategy from DB
             c = conn.cursor()
             c.execute("""
@@ -1113,14 +1321,15 @@ def manage_trailing_stops(strategy_id: int, *, rr_trigger: float = 2.0, lock_rr:
                 WHERE strategy_id = ? AND executed=1
             """, (strategy_id,))
             rows = c.fetchall()
+            by_sym = _positions_by_symbol()   # one IPC call instead of one per ticker
             for (ticker,) in rows:
                 sym = normalize_symbol(ticker)
-                if _has_open_position(sym, 99):
+                pos = _our_position(by_sym, sym, 99)
+                if pos:
                     maybe_trail_position(conn, ticker, sym,
-                                         rr_trigger=rr_trigger, lock_rr=lock_rr, magic=99)
-            time.sleep(poll_seconds)
+                                         rr_trigger=rr_trigger, lock_rr=lock_rr, magic=99, pos=pos)
+            _sleep_rest_of(poll_seconds, started)
     finally:
-        conn.close()
         shutdown_mt5()
 
 
@@ -1190,54 +1399,57 @@ if __name__ == "__main__":
 
     args = p.parse_args()
 
-    if args.close_only:
-        close_strategy_positions(
-            args.strategy_id,
-            force=args.force_close,
-            deviation=args.close_deviation,
-        )
-
-    elif args.watch_crsi:
-        monitor_crsi_and_execute(
-            args.strategy_id,
-            per_position_eur=args.per_pos_eur,
-            threshold=args.crsi_threshold,
-            poll_seconds=args.poll,
-            session_start=args.session_start,
-            session_end=args.session_end,
-        )
-
-    elif args.watch_sr30:
-        monitor_sr30_and_execute(
-            args.strategy_id,
-            per_position_eur=args.per_pos_eur,
-            use_atr_buffer=not args.no_atr_buffer,
-            use_volume_filter=not args.no_volume_filter,
-            vol_mult=args.vol_mult,
-            vol_lookback=args.vol_lookback,
-            confirm_close=args.confirm_close,
-            rr=args.rr,
-            poll_seconds=args.poll,
-            session_start=args.session_start,
-            session_end=args.session_end,
-        )
-
-    elif args.trail:
-        manage_trailing_stops(
-            args.strategy_id,
-            rr_trigger=args.trail_trigger,
-            lock_rr=args.trail_lock,
-            poll_seconds=args.poll,
-        )
+    # the watchers run until stopped: Ctrl-C unwinds through their finally blocks
+    # (queue writes, MT5 shutdown) and exits with the usual status instead of a traceback
+    try:
+        if args.close_only:
+            close_strategy_positions(
+                args.strategy_id,
+                force=args.force_close,
+                deviation=args.close_deviation,
+            )
 
-    else:
-        # Open-now path (legacy / immediate open)
-        execute_strategy(
-            args.strategy_id,
-            leverage=args.leverage,
-            even_bet=args.even_bet,
-            override_capital=args.capital,
-        )
+        elif args.watch_crsi:
+            monitor_crsi_and_execute(
+                args.strategy_id,
+                per_position_eur=args.per_pos_eur,
+                threshold=args.crsi_threshold,
+                poll_seconds=args.poll,
+                session_start=args.session_start,
+                session_end=args.session_end,
+            )
+
+        elif args.watch_sr30:
+            monitor_sr30_and_execute(
+                args.strategy_id,
+                per_position_eur=args.per_pos_eur,
+                use_atr_buffer=not args.no_atr_buffer,
+                use_volume_filter=not args.no_volume_filter,
+                vol_mult=args.vol_mult,
+                vol_lookback=args.vol_lookback,
+                confirm_close=args.confirm_close,
+                rr=args.rr,
+                poll_seconds=args.poll,
+                session_start=args.session_start,
+                session_end=args.session_end,
+            )
 
+        elif args.trail:
+            manage_trailing_stops(
+                args.strategy_id,
+                rr_trigger=args.trail_trigger,
+                lock_rr=args.trail_lock,
+                poll_seconds=args.poll,
+            )
 
-    
+        else:
+            # Open-now path (legacy / immediate open)
+            execute_strategy(
+                args.strategy_id,
+                leverage=args.leverage,
+                even_bet=args.even_bet,
+                override_capital=args.capital,
+            )
+    except KeyboardInterrupt:
+        log.info("Interrupted by user.")
+        sys.exit(130)
@@ -1,11 +1,11 @@
-import sqlite3
 from datetime import datetime, timedelta, timezone
 import yfinance as yf
 import os
 import finnhub
 import pandas as pd
 from dotenv import load_dotenv
-import sqlite3, datetime, pytz
+import datetime, pytz
+from db_schema import get_connection, DB_PATH   # WAL + busy timeout, shared with the MT5 / IB runners
 
 EASTERN = pytz.timezone("US/Eastern")
 
@@ -125,7 +125,7 @@ def simulate_atr_stop(
     return False, entry_price
 
 def enter_trades(stocks_to_buy, trade_count, strategy_id=None):
-    connection = sqlite3.connect("algo1.db")
+    connection = get_connection()
     cursor = connection.cursor()
 
     cursor.execute("SELECT COUNT(*) FROM open_trades WHERE strategy_id = ?", (strategy_id,))
@@ -185,7 +185,7 @@ def monitor_and_close_trades(strategy_id):
     """
     Close a trade if stop-loss or target hit *or* at end-of-day.
     """
-    connection = sqlite3.connect("algo1.db")
+    connection = get_connection()
     cursor     = connection.cursor()
 
     cursor.execute("""
@@ -239,7 +239,7 @@ def monitor_and_close_trades(strategy_id):
     connection.close()
 # ─────────────────────────────────────────────────────────────
 def calculate_unrealized_pnl(strategy_id):
-    conn = sqlite3.connect("algo1.db")
+    conn = get_connection()
     cur  = conn.cursor()
 
     cur.execute("""
@@ -289,9 +289,9 @@ def calculate_unrealized_pnl(strategy_id):
     conn.close()
 
 
-def queue_trades(tickers, strategy_id, db="algo1.db"):
+def queue_trades(tickers, strategy_id, db=DB_PATH):
     ts = datetime.datetime.now(EASTERN).isoformat(timespec="seconds")
-    conn = sqlite3.connect(db)
+    conn = get_connection(db)
     cur  = conn.cursor()
     for tk in tickers:
         cur.execute("""
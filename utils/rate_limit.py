@@ -0,0 +1,40 @@
+# rate_limit.py
+
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Token bucket allowing bursts of up to `rate` calls per `per` seconds.
+    acquire() only sleeps when the bucket is empty, so callers that stay
+    under the budget never wait.
+    """
+
+    def __init__(self, rate, per=1.0):
+        """
+        Args:
+            rate (int): Number of calls allowed per window (also the burst size).
+            per (float): Window length in seconds.
+        """
+        self.rate = float(rate)
+        self.per = float(per)
+        self.tokens = float(rate)
+        self.last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Take one token, sleeping until one is available if needed.
+        Safe to call from several threads.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.last) * self.rate / self.per)
+            self.last = now
+            if self.tokens < 1.0:
+                wait = (1.0 - self.tokens) * self.per / self.rate
+                time.sleep(wait)
+                self.last = time.monotonic()
+                self.tokens = 1.0
+            self.tokens -= 1.0
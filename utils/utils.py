@@ -2,10 +2,11 @@
 
 import csv
 import os
-import sqlite3
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 import finnhub
+from utils.rate_limit import RateLimiter
+from db_schema import get_connection
 
 load_dotenv()                                    # loads .env
 FINNHUB_API_KEY = os.getenv("FINNHUB_API_KEY")   # must exist
@@ -15,6 +16,9 @@ if not FINNHUB_API_KEY:
 
 finn = finnhub.Client(api_key=FINNHUB_API_KEY)
 
+# Finnhub rejects more than 30 calls/second; only waits when calls are actually made
+FINNHUB_LIMITER = RateLimiter(rate=30, per=1.0)
+
 def load_stocks_from_csv(file_name="stocks.csv"):
     """
     Load stock tickers from a CSV file.
@@ -34,12 +38,13 @@ def load_stocks_from_csv(file_name="stocks.csv"):
     return tickers
 
 def fetch_top_stocks(n=30, descending=True):
-    connection = sqlite3.connect("algo1.db")
+    connection = get_connection()
     cursor = connection.cursor()
 
     year_month = datetime.now().strftime("%Y_%m")
     order = "DESC" if descending else "ASC"
 
+    # ranking expression is indexed (ix_scores_ym_rank in db_schema) – keep them in sync
     cursor.execute(f"""
         SELECT ticker, analyst_avg_score, price_target_score, date
         FROM scores
@@ -53,7 +58,7 @@ def fetch_top_stocks(n=30, descending=True):
     return top_stocks
 
 def get_daily_average_score(n=30):
-    connection = sqlite3.connect("algo1.db")
+    connection = get_connection()
     cursor = connection.cursor()
 
     current_date = datetime.now().strftime("%Y-%m-%d")
@@ -85,6 +90,7 @@ def filter_stocks_by_performance(ticker_list, lookback_days=31, min_positive=15)
     for ticker in ticker_list:
         try:
             # Daily candles: resolution = 'D'
+            FINNHUB_LIMITER.acquire()
             candles = finn.stock_candles(ticker, 'D', start_ts, end_ts)
             if candles.get("s") != "ok" or not candles["c"]:
                 continue